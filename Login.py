@@ -1,5 +1,10 @@
 import streamlit as st
 import helper_functions.security as security
+from helper_functions.warmup import start_warmup
+
+# Once per process: load the course index, tokenizer, OpenAI client and dashboard data in
+# the background while users log in (set WARMUP = false in secrets.toml to turn it off)
+start_warmup()
 
 st.title('Login')
 st.sidebar.success("Please login and select one of the functions above. \n\nTo logout, click on Login function again")
@@ -0,0 +1,65 @@
+"""
+Compare FAISS index types on the persisted corpus: recall@k against the exact flat index,
+per-query latency and index size. Run from the project root:
+
+    python -m benchmarks.faiss_index_benchmark --queries 200 --k 5
+"""
+import os
+import time
+import argparse
+import numpy as np
+import faiss
+from helper_functions.index_types import INDEX_TYPES, DEFAULT_PARAMS, build_index
+
+PERSIST_DIR = "./faiss_db"
+
+
+def make_queries(vectors, n_queries: int, noise: float, seed: int = 0):
+    """Perturbed copies of stored vectors, so no embedding API calls are needed."""
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vectors), size=min(n_queries, len(vectors)), replace=False)
+    queries = vectors[picks] + rng.normal(0, noise, size=(len(picks), vectors.shape[1])).astype(np.float32)
+    return queries.astype(np.float32)
+
+
+def recall_at_k(truth, found, k: int) -> float:
+    hits = sum(len(set(t[:k]) & set(f[:k]) - {-1}) for t, f in zip(truth, found))
+    return hits / (len(truth) * k)
+
+
+def run(persist_dir: str, n_queries: int, k: int, noise: float):
+    flat = faiss.read_index(os.path.join(persist_dir, "index.faiss"))
+    vectors = flat.reconstruct_n(0, flat.ntotal)
+    queries = make_queries(vectors, n_queries, noise)
+    _, truth = flat.search(queries, k)
+    print(f"Corpus: {flat.ntotal} vectors x {flat.d} dims, {len(queries)} queries, k={k}\n")
+    print(f"{'index':<8} {'build s':>8} {'recall@k':>9} {'mean ms':>8} {'p95 ms':>8} {'size MB':>8}")
+
+    for index_type in INDEX_TYPES:
+        start = time.perf_counter()
+        index = build_index(vectors, index_type, DEFAULT_PARAMS[index_type])
+        build_seconds = time.perf_counter() - start
+
+        # One query at a time, the way the Course Assistant searches
+        latencies, found = [], []
+        for query in queries:
+            start = time.perf_counter()
+            _, indices = index.search(query.reshape(1, -1), k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found.append(indices[0])
+
+        size_mb = faiss.serialize_index(index).nbytes / 1e6
+        print(
+            f"{index_type:<8} {build_seconds:>8.2f} {recall_at_k(truth, found, k):>9.3f} "
+            f"{np.mean(latencies):>8.3f} {np.percentile(latencies, 95):>8.3f} {size_mb:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--persist-dir", default=PERSIST_DIR)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--noise", type=float, default=0.01, help="std dev added to sampled query vectors")
+    args = parser.parse_args()
+    run(args.persist_dir, args.queries, args.k, args.noise)
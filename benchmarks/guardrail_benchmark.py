@@ -0,0 +1,112 @@
+"""
+Compare the compiled guardrail engine with the per-pattern regex loops it replaced, for
+growing rule sets and text sizes. Run from the project root:
+
+    python -m benchmarks.guardrail_benchmark --rules 10 100 500 --chars 200 5000
+"""
+import re
+import time
+import random
+import argparse
+from helper_functions.guardrails import (
+    GuardrailEngine, FORBIDDEN_PATTERNS, SENSITIVE_KEYWORDS, is_suspicious, sanitize_output, sanitize_stream
+)
+
+WORDS = [
+    "course", "diploma", "career", "student", "salary", "graduate", "industry", "finance",
+    "health", "data", "science", "engineering", "business", "design", "instructions", "hidden",
+    "system", "secret", "reveal", "prompt", "template", "script", "output", "internal"
+]
+# Text never contains the trigger words, so it is benign and every rule has to be ruled out
+# across the whole text, which is both the common case and the slow one
+TEXT_WORDS = WORDS[:15]
+TRIGGER_WORDS = WORDS[15:]
+
+
+def legacy_is_suspicious(user_input: str, patterns) -> bool:
+    user_input_lower = user_input.lower()
+    return any(re.search(pattern, user_input_lower) for pattern in patterns)
+
+
+def legacy_sanitize_output(output: str, keywords) -> str:
+    sanitized = output
+    for keyword in keywords:
+        sanitized = re.sub(keyword, "[REDACTED]", sanitized, flags=re.IGNORECASE)
+    return sanitized
+
+
+# Characters whose lowercase is longer ("İ") or that IGNORECASE equates with a letter ("ſ", "K")
+EDGE_CASES = [
+    "İ ſystem prompt",
+    "İ System Prompt",
+    "İİ reveal SECRET now",
+    "the Kelvin sign and a hidden message",
+    "İ ſystem instructions",
+    "İ the System Instructions, then the İ API KEY"
+]
+
+
+def check_edge_cases():
+    """The shipped rules on text whose length changes when lowercased, as whole text and as a stream."""
+    for text in EDGE_CASES:
+        assert is_suspicious(text) == legacy_is_suspicious(text, FORBIDDEN_PATTERNS), text
+        for size in (1, 5, 12):
+            chunks = [text[i:i + size] for i in range(0, len(text), size)]
+            assert "".join(sanitize_stream(chunks)) == sanitize_output(text), text
+    assert sanitize_output("İ the System Instructions, then the İ API KEY") == "İ the [REDACTED], then the İ [REDACTED]"
+
+
+def make_rules(base, n: int, rng):
+    """The shipped rules padded with distinct random three-word phrases up to n rules."""
+    rules = dict.fromkeys(base)
+    while len(rules) < n:
+        rules[f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.choice(TRIGGER_WORDS)}"] = None
+    return list(rules)[:n]
+
+
+def make_text(n_chars: int, rng) -> str:
+    words = []
+    while sum(len(word) + 1 for word in words) < n_chars:
+        words.append(rng.choice(TEXT_WORDS))
+    return " ".join(words)[:n_chars]
+
+
+def timeit(fn, repeat: int) -> float:
+    """Mean milliseconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def run(rule_counts, char_counts, repeat: int):
+    check_edge_cases()
+    rng = random.Random(0)
+    print(f"{'check':<10} {'rules':>6} {'chars':>7} {'legacy ms':>10} {'engine ms':>10} {'speedup':>8}")
+    for n_rules in rule_counts:
+        input_rules = make_rules(FORBIDDEN_PATTERNS, n_rules, rng)
+        output_rules = make_rules(SENSITIVE_KEYWORDS, n_rules, rng)
+        input_engine = GuardrailEngine(input_rules)
+        output_engine = GuardrailEngine(output_rules)
+        for n_chars in char_counts:
+            text = make_text(n_chars, rng)
+            # Redacted text is not compared: with overlapping rules the old loop depends on rule order
+            assert legacy_is_suspicious(text, input_rules) == (input_engine.first_match(text) is not None)
+            rows = [
+                ("input", timeit(lambda: legacy_is_suspicious(text, input_rules), repeat),
+                 timeit(lambda: input_engine.first_match(text), repeat)),
+                ("output", timeit(lambda: legacy_sanitize_output(text, output_rules), repeat),
+                 timeit(lambda: output_engine.redact(text), repeat))
+            ]
+            for check, legacy_ms, engine_ms in rows:
+                print(f"{check:<10} {n_rules:>6} {n_chars:>7} {legacy_ms:>10.3f} {engine_ms:>10.3f} "
+                      f"{legacy_ms / engine_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rules", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--chars", type=int, nargs="+", default=[200, 5000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    run(args.rules, args.chars, args.repeat)
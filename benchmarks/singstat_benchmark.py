@@ -0,0 +1,133 @@
+"""
+Compare the vectorised SingStat/GES reshaping in helper_functions.singstat with the
+row-wise functions the dashboard used before, on the shipped CSVs and on synthetic
+tables with more series and years. Run from the project root:
+
+    python -m benchmarks.singstat_benchmark --series 26 1000 10000 --years 31 60
+"""
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from helper_functions.singstat import tidy_course_series, tidy_graduate_survey
+
+DATA_DIR = "Data"
+ENROLMENT_CSV = "EnrolmentInPolytechnicDiplomaCoursesByTypeOfCourseAndSexAnnual.csv"
+SALARY_CSV = "ges_median_salary.csv"
+
+
+def legacy_preprocess_df(df, type_label):
+    df.columns = df.columns.str.strip()
+    df_long = df.melt(id_vars=["DataSeries"], var_name="Year", value_name="Count")
+    df_long["Year"] = pd.to_numeric(df_long["Year"], errors="coerce")
+    df_long["Count"] = pd.to_numeric(df_long["Count"], errors="coerce")
+    df_long["Sex"] = df_long["DataSeries"].apply(
+        lambda x: "Male" if str(x).strip().startswith("Males")
+                else ("Female" if str(x).strip().startswith("Females") else None)
+    )
+    df_long["Course"] = df_long["DataSeries"].str.split(":", n=1).str[-1].str.strip()
+    df_long["Course"] = df_long["Course"].fillna("Total")
+    df_long["Type"] = type_label
+    return df_long
+
+
+def legacy_salary(df_salary):
+    df_long = df_salary.melt(id_vars="Course Cluster", var_name="TypeYear", value_name="Salary")
+
+    def split_type_year(s):
+        s = s.strip()
+        if "Fresh Graduates" in s:
+            type_ = "Fresh"
+        elif "Post-NS" in s:
+            type_ = "Post-NS"
+        elif "Combined" in s:
+            type_ = "Combined"
+        else:
+            type_ = "Unknown"
+        year = int(s[-4:])
+        return pd.Series([type_, year])
+
+    df_long[["Type", "Year"]] = df_long["TypeYear"].apply(split_type_year)
+    return df_long
+
+
+def synthetic_course_table(n_series: int, n_years: int, seed: int = 0):
+    """SingStat-shaped table: "Males: Course n" rows, year columns, some "na" and "-" cells."""
+    rng = np.random.default_rng(seed)
+    names = [f"    {'Males' if i % 2 else 'Females'}: Course {i // 2}" for i in range(n_series)]
+    values = rng.integers(0, 5000, size=(n_series, n_years)).astype(object)
+    values[rng.random(values.shape) < 0.05] = "na"
+    values[rng.random(values.shape) < 0.02] = "-"
+    df = pd.DataFrame(values, columns=[str(2023 - i) for i in range(n_years)])
+    df.insert(0, "DataSeries", names)
+    return df
+
+
+def synthetic_survey_table(n_rows: int, n_years: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    types = ["Fresh Graduates", "Post-NS (PNS) Graduates", "Combined (Fresh and PNS Graduates)"]
+    columns = [f"{t} {2024 - y}" for t in types for y in range(n_years)]
+    df = pd.DataFrame(rng.integers(2000, 4000, size=(n_rows, len(columns))), columns=columns)
+    df.insert(0, "Course Cluster", [f"Cluster {i}" for i in range(n_rows)])
+    return df
+
+
+def check_course(legacy, new):
+    assert len(legacy) == len(new)
+    assert (legacy["Year"].to_numpy() == new["Year"].to_numpy()).all()
+    assert np.allclose(legacy["Count"].to_numpy(float), new["Count"].to_numpy(float), equal_nan=True)
+    for col in ["Sex", "Course"]:
+        assert (legacy[col].fillna("").to_numpy() == new[col].astype(object).fillna("").to_numpy()).all(), col
+
+
+def check_survey(legacy, new):
+    assert (legacy["Type"].to_numpy() == new["Type"].astype(object).to_numpy()).all()
+    assert (legacy["Year"].to_numpy() == new["Year"].to_numpy()).all()
+
+
+def timeit(fn, repeat: int) -> float:
+    """Best of repeat, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def report(label, rows, legacy_ms, new_ms):
+    print(f"{label:<28} {rows:>10,} {legacy_ms:>10.2f} {new_ms:>10.2f} {legacy_ms / new_ms:>8.1f}x")
+
+
+def run(series_counts, year_counts, repeat: int):
+    print(f"{'table':<28} {'rows':>10} {'legacy ms':>10} {'new ms':>10} {'speedup':>9}")
+    cases = []
+    if os.path.exists(os.path.join(DATA_DIR, ENROLMENT_CSV)):
+        cases.append(("enrolment (shipped)", pd.read_csv(os.path.join(DATA_DIR, ENROLMENT_CSV)), "course"))
+        cases.append(("salary (shipped)", pd.read_csv(os.path.join(DATA_DIR, SALARY_CSV)), "survey"))
+    for n_series in series_counts:
+        for n_years in year_counts:
+            cases.append((f"course {n_series}x{n_years}", synthetic_course_table(n_series, n_years), "course"))
+            cases.append((f"survey {n_series}x{n_years}", synthetic_survey_table(n_series, n_years), "survey"))
+
+    for label, df, kind in cases:
+        if kind == "course":
+            legacy_fn = lambda: legacy_preprocess_df(df.copy(), "Enrolment")
+            new_fn = lambda: tidy_course_series(df, "Enrolment")
+            check_course(legacy_fn(), new_fn())
+        else:
+            legacy_fn = lambda: legacy_salary(df)
+            new_fn = lambda: tidy_graduate_survey(df, "Course Cluster", "Salary")
+            check_survey(legacy_fn(), new_fn())
+        rows = df.shape[0] * (df.shape[1] - 1)
+        report(label, rows, timeit(legacy_fn, repeat), timeit(new_fn, repeat))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, nargs="+", default=[26, 1000, 10000])
+    parser.add_argument("--years", type=int, nargs="+", default=[31, 60])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.series, args.years, args.repeat)
@@ -0,0 +1,131 @@
+import json
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+import faiss
+from helper_functions.embedding_cache import normalize_text
+
+MAX_ENTRIES = 500
+TTL_SECONDS = 24 * 60 * 60
+SIMILARITY_THRESHOLD = 0.92  # cosine similarity between question embeddings
+SEARCH_NEIGHBOURS = 5  # near questions checked for a usable entry (same scope and index version)
+
+#answer_scope
+def answer_scope(filters) -> str:
+    """Answers only apply to queries asked with the same retrieval filters."""
+    return json.dumps({field: sorted(map(str, values)) for field, values in (filters or {}).items() if values}, sort_keys=True)
+
+
+class SemanticAnswerCache:
+    """
+    Cache of sanitized answers keyed on the question. A query reuses an answer when its
+    normalised text matches exactly, or when its embedding is within SIMILARITY_THRESHOLD
+    of a past question, as long as the answer was produced from the same faiss_db version
+    and filters. Entries expire after TTL_SECONDS and the least recently used are evicted.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl_seconds: int = TTL_SECONDS,
+                 threshold: float = SIMILARITY_THRESHOLD):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # id -> entry, least recently used first
+        self._by_text = {}  # (normalised question, scope) -> id
+        self._index = None  # inner product over normalised question vectors, created on first store
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+
+    @staticmethod
+    def _text_key(query: str, scope: str):
+        return normalize_text(query).lower(), scope
+
+    @staticmethod
+    def _unit(vector):
+        vector = np.array([vector], dtype=np.float32)
+        faiss.normalize_L2(vector)
+        return vector
+
+    def _usable(self, entry_id, scope: str, version: str) -> bool:
+        entry = self._entries.get(entry_id)
+        if entry is None:
+            return False
+        if entry["version"] != version or time.time() - entry["created"] > self.ttl_seconds:
+            self._remove(entry_id)
+            return False
+        return entry["scope"] == scope
+
+    def _remove(self, entry_id):
+        entry = self._entries.pop(entry_id)
+        self._by_text.pop(self._text_key(entry["question"], entry["scope"]), None)
+        if entry["has_vector"]:
+            self._index.remove_ids(np.array([entry_id], dtype=np.int64))
+
+    def _hit(self, entry_id):
+        self._entries.move_to_end(entry_id)
+        entry = self._entries[entry_id]
+        self.hits += 1
+        self.saved_tokens += entry["tokens"]
+        return entry["answer"]
+
+    def lookup_text(self, query: str, scope: str, version: str):
+        """Exact (normalised) question match; needs no embedding. Does not count a miss."""
+        with self._lock:
+            entry_id = self._by_text.get(self._text_key(query, scope))
+            if entry_id is not None and self._usable(entry_id, scope, version):
+                return self._hit(entry_id)
+            return None
+
+    def lookup(self, query: str, scope: str, version: str, vector=None):
+        """Return a cached answer for query, or None (counted as a miss)."""
+        answer = self.lookup_text(query, scope, version)
+        if answer is not None:
+            return answer
+        with self._lock:
+            if vector is not None and self._index is not None and self._index.ntotal:
+                scores, ids = self._index.search(self._unit(vector), min(SEARCH_NEIGHBOURS, self._index.ntotal))
+                for score, entry_id in zip(scores[0], ids[0]):
+                    if entry_id == -1 or score < self.threshold:
+                        break
+                    if self._usable(int(entry_id), scope, version):
+                        return self._hit(int(entry_id))
+            self.misses += 1
+            return None
+
+    def store(self, query: str, answer: str, scope: str, version: str, vector=None, tokens: int = 0):
+        with self._lock:
+            existing = self._by_text.get(self._text_key(query, scope))
+            if existing is not None:
+                self._remove(existing)
+            entry_id = self._next_id
+            self._next_id += 1
+            if vector is not None:
+                if self._index is None:
+                    self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(len(vector)))
+                self._index.add_with_ids(self._unit(vector), np.array([entry_id], dtype=np.int64))
+            self._entries[entry_id] = {
+                "question": query,
+                "answer": answer,
+                "scope": scope,
+                "version": version,
+                "created": time.time(),
+                "tokens": tokens,
+                "has_vector": vector is not None
+            }
+            self._by_text[self._text_key(query, scope)] = entry_id
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_tokens": self.saved_tokens
+            }
@@ -0,0 +1,117 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+CACHE_PATH = "./cache/completions.sqlite3"
+MAX_BYTES = 50 * 1024 * 1024  # total size of cached responses
+TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+class CompletionCache:
+    """
+    Exact-match cache of chat completions in SQLite, keyed on the full request
+    (model, messages, temperature, top_p, max_tokens, response_format). Only
+    temperature 0 requests are cached; everything else bypasses it. Entries older than
+    ttl_seconds are ignored and the least recently used are evicted past max_bytes.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = MAX_BYTES, ttl_seconds: int = TTL_SECONDS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_last_used ON completions(last_used)")
+        self._conn.commit()
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+
+    @staticmethod
+    def request_key(request: dict) -> str:
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                return None
+            self._conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, response: str):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM completions WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, response, size, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now)
+            )
+            self._bytes += size - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM completions WHERE created < ?", (now - self.ttl_seconds,))
+        # Then least recently used until back under 90% of the limit
+        target = int(self.max_bytes * 0.9)
+        total = 0
+        for key, size in self._conn.execute("SELECT key, size FROM completions ORDER BY last_used DESC").fetchall():
+            total += size
+            if total > target:
+                self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                total -= size
+        self._bytes = total
+
+    def get_or_create(self, request: dict, create_fn):
+        """Return the cached response for request, or call create_fn() and cache its result."""
+        if request.get("temperature") != 0:
+            self.bypassed += 1
+            return create_fn()
+        key = self.request_key(request)
+        response = self.get(key)
+        if response is not None:
+            self.hits += 1
+            return response
+        self.misses += 1
+        response = create_fn()
+        if response is not None:
+            self.put(key, response)
+        return response
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes": self._bytes
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+#get_completion_cache
+def get_completion_cache() -> CompletionCache:
+    """Process-wide cache used by llm.get_completion and llm.get_completion_by_messages."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CompletionCache()
+        return _cache
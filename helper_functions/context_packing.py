@@ -0,0 +1,87 @@
+import io
+import csv
+import helper_functions.llm as llm
+
+CONTEXT_TOKEN_BUDGET = 1500  # tokens of retrieved context allowed in the advisor prompt
+EMPTY_VALUES = {"", "na", "n.a.", "-"}  # cells that carry no information in the SingStat tables
+
+
+def _split_chunk(doc):
+    """Return (prefix lines, row lines). Row-aware chunks start with "Source:" and the header."""
+    lines = [line for line in doc.page_content.split("\n") if line.strip()]
+    if len(lines) >= 2 and lines[0].startswith("Source: "):
+        return lines[:2], lines[2:]
+    return [], lines
+
+#compress_table
+def compress_table(header: str, rows):
+    """Drop columns that are empty or "na" in every selected row."""
+    parsed_header = next(csv.reader([header]))
+    parsed_rows = list(csv.reader(rows))
+    if not parsed_rows or any(len(row) != len(parsed_header) for row in parsed_rows):
+        return header, list(rows)
+    keep = [
+        i for i in range(len(parsed_header))
+        if i == 0 or any(row[i].strip().lower() not in EMPTY_VALUES for row in parsed_rows)
+    ]
+    if len(keep) == len(parsed_header):
+        return header, list(rows)
+
+    def join(values):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="").writerow(list(values))
+        return buffer.getvalue()
+
+    return join(parsed_header[i] for i in keep), [join(row[i] for i in keep) for row in parsed_rows]
+
+#pack_context
+def pack_context(docs, budget_tokens: int = CONTEXT_TOKEN_BUDGET, compress_tables: bool = True):
+    """
+    Assemble the {context} text from ranked Documents within budget_tokens. Chunks from
+    the same source are merged under one "Source:"/header prefix and repeated rows are
+    dropped; rows are then taken in rank order while they fit. With compress_tables,
+    columns that are empty in every selected row of a table are removed.
+    Returns (context, stats).
+    """
+    blocks = {}  # prefix (or chunk position for plain text) -> {"prefix": [...], "rows": [...]}
+    seen_rows = set()
+    used_tokens = 0
+    used_chunks = 0
+
+    for n, doc in enumerate(docs):
+        prefix, rows = _split_chunk(doc)
+        key = tuple(prefix) if prefix else n
+        rows = [row for row in rows if (key, row) not in seen_rows]
+        if not rows:
+            continue
+        new_block = key not in blocks
+        prefix_tokens = sum(llm.count_tokens_batch(prefix)) + len(prefix) if new_block and prefix else 0
+        took_any = False
+        for row, tokens in zip(rows, llm.count_tokens_batch(rows)):
+            cost = tokens + 1 + (prefix_tokens if not took_any and new_block else 0)
+            if used_tokens + cost > budget_tokens:
+                continue
+            if not took_any and new_block:
+                blocks[key] = {"prefix": prefix, "rows": []}
+            blocks[key]["rows"].append(row)
+            seen_rows.add((key, row))
+            used_tokens += cost
+            took_any = True
+        used_chunks += took_any
+
+    sections = []
+    for block in blocks.values():
+        prefix, rows = block["prefix"], block["rows"]
+        if prefix and compress_tables:
+            header, rows = compress_table(prefix[1], rows)
+            prefix = [prefix[0], header]
+        sections.append("\n".join(prefix + rows))
+    context = "\n\n".join(sections)
+
+    stats = {
+        "chunks_retrieved": len(docs),
+        "chunks_used": used_chunks,
+        "context_tokens": llm.count_tokens(context) if context else 0,
+        "budget_tokens": budget_tokens
+    }
+    return context, stats
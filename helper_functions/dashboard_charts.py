@@ -0,0 +1,211 @@
+import io
+import math
+import streamlit as st
+from helper_functions.dashboard_store import load_tables
+from helper_functions.singstat import GRADUATE_TYPES
+
+LATEST_YEARS = 3  # enrolment and graduate charts show the most recent years only
+DEFAULT_COURSES = 3  # courses preselected in the multiselects
+MAX_CHART_ROWS = 5000  # rows sent to the browser per interactive chart; beyond this years are thinned
+CHART_MODES = ["Interactive", "Static image"]
+DEFAULT_CHART_MODE = "Interactive"
+
+CHART_TITLES = {
+    "enrolment": "Polytechnic Enrolment by Sex and Course (Last 3 Years)",
+    "graduates": "Polytechnic Graduates by Sex and Course (Last 3 Years)",
+    "employment": "Graduate Employment by Type (Fresh / Post-NS / Combined) 2022–2024",
+    "salary": "Graduate Salary by Course Cluster (Fresh / Post-NS / Combined) 2022–2024"
+}
+
+
+def recent_years(df, n: int = LATEST_YEARS):
+    latest_years = sorted(df["Year"].unique())[-n:]
+    return df[df["Year"].isin(latest_years)]
+
+#course_options
+def course_options(df):
+    """Sorted course names of a tidy enrolment/graduates table, for the multiselects."""
+    return sorted(recent_years(df)["Course"].unique())
+
+#course_plot_data
+def course_plot_data(df, courses):
+    """Recent rows of the selected courses, without the Total rows, labelled "Sex - Course"."""
+    df_plot = recent_years(df)
+    df_plot = df_plot[df_plot["Course"].isin(courses) & (df_plot["Course"] != "Total")].copy()
+    df_plot["SexCourse"] = df_plot["Sex"].astype(str) + " - " + df_plot["Course"].astype(str)
+    return df_plot
+
+
+# seaborn, matplotlib and altair are imported by the functions that draw with them, so
+# importing this module (at startup, or for the interactive charts only) stays cheap
+
+def _course_trend(ax, df, courses, title):
+    import seaborn as sns
+
+    df_plot = course_plot_data(df, courses)
+    sns.lineplot(
+        data=df_plot,
+        x=df_plot["Year"].astype(str),  # discrete axis
+        y="Count",
+        hue="SexCourse",  # separate line for Male/Female per course
+        markers=True,
+        dashes=False,
+        errorbar=None,
+        ax=ax
+    )
+    ax.set_title(title)
+    ax.set_ylabel("Number of Students")
+    ax.set_xlabel("Year")
+    ax.tick_params(axis="x", rotation=45)
+
+
+def _employment(ax, df, courses):
+    import seaborn as sns
+    from matplotlib.artist import setp
+
+    sns.barplot(data=df, x="Indicator", y="Percentage", hue="Type", errorbar=None, palette="Set2", ax=ax)
+    setp(ax.get_xticklabels(), rotation=45, ha="right")
+    ax.set_ylabel("Percentage (%)")
+    ax.set_title(CHART_TITLES["employment"])
+    ax.legend(title="Graduate Type")
+
+
+def _salary(ax, df, courses):
+    import seaborn as sns
+    from matplotlib.artist import setp
+
+    df_plot = df[df["Course Cluster"] != "Overall"]  # omit the "Overall" row
+    sns.barplot(data=df_plot, x="CourseYear", y="Salary", hue="Type", errorbar=None, palette="Set2", ax=ax)
+    ax.set_title(CHART_TITLES["salary"])
+    ax.set_ylabel("Salary ($)")
+    ax.set_xlabel("Course Cluster (Year)")
+    setp(ax.get_xticklabels(), rotation=45, ha="right")
+    ax.legend(title="Graduate Type")
+
+
+# Chart id -> table it is drawn from, figure size and draw(ax, table, selected courses)
+CHARTS = {
+    "enrolment": {
+        "table": "enrolment", "figsize": (14, 7),
+        "draw": lambda ax, df, courses: _course_trend(ax, df, courses, CHART_TITLES["enrolment"])
+    },
+    "graduates": {
+        "table": "graduates", "figsize": (14, 7),
+        "draw": lambda ax, df, courses: _course_trend(ax, df, courses, CHART_TITLES["graduates"])
+    },
+    "employment": {"table": "employment", "figsize": (16, 7), "draw": _employment},
+    "salary": {"table": "salary", "figsize": (18, 8), "draw": _salary}
+}
+
+# Keyed on the dataset version, chart id and selection; the tables argument is not hashed,
+# the version identifies them. Figures are built directly rather than through pyplot, so
+# no global figure state is shared between sessions and nothing is left open.
+@st.cache_data(max_entries=256, show_spinner=False)
+def _render_chart(_tables, version: str, chart_id: str, courses: tuple) -> bytes:
+    from matplotlib.figure import Figure
+
+    spec = CHARTS[chart_id]
+    fig = Figure(figsize=spec["figsize"])
+    try:
+        spec["draw"](fig.subplots(), _tables[spec["table"]], list(courses))
+        fig.tight_layout()
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=200, bbox_inches="tight")  # as st.pyplot saved them
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+#render_chart
+def render_chart(tables, version: str, chart_id: str, courses=()) -> bytes:
+    """PNG bytes of a dashboard chart, rendered once per dataset version and course selection."""
+    # The plotted rows do not depend on the order the courses were picked in
+    return _render_chart(tables, version, chart_id, tuple(sorted(courses)))
+
+def _default_selections(tables):
+    """Chart id -> the courses its multiselect starts with (none for charts without one)."""
+    selections = {}
+    for chart_id, spec in CHARTS.items():
+        table = tables[spec["table"]]
+        selections[chart_id] = course_options(table)[:DEFAULT_COURSES] if "Course" in table.columns else []
+    return selections
+
+#prerender_default_charts
+def prerender_default_charts():
+    """Render every static chart with its default selection, so a first visit in static mode is served from cache."""
+    tables, version = load_tables()
+    for chart_id, courses in _default_selections(tables).items():
+        render_chart(tables, version, chart_id, courses)
+
+
+# --- Interactive charts: only the aggregated rows go to the browser, which renders them with Vega-Lite ---
+
+def _thin_years(data, max_rows: int):
+    """Keep every k-th year so that at most about max_rows rows are left."""
+    if len(data) <= max_rows:
+        return data
+    years = sorted(data["Year"].unique())
+    step = math.ceil(len(data) / max_rows)
+    return data[data["Year"].isin(years[::-1][::step])]
+
+
+def _course_trend_data(df, courses):
+    data = course_plot_data(df, courses)
+    data = data.groupby(["Year", "SexCourse"], observed=True, as_index=False)["Count"].mean()
+    return _thin_years(data, MAX_CHART_ROWS)
+
+
+# Chart id -> function returning the compact rows the chart encodes, mean-aggregated the way
+# seaborn aggregates them for the static charts
+CHART_DATA = {
+    "enrolment": lambda tables, courses: _course_trend_data(tables["enrolment"], courses),
+    "graduates": lambda tables, courses: _course_trend_data(tables["graduates"], courses),
+    "employment": lambda tables, courses: tables["employment"].groupby(
+        ["Indicator", "Type"], observed=True, sort=False, as_index=False
+    )["Percentage"].mean(),
+    "salary": lambda tables, courses: tables["salary"][tables["salary"]["Course Cluster"] != "Overall"].groupby(
+        ["CourseYear", "Type"], observed=True, sort=False, as_index=False
+    )["Salary"].mean()
+}
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _chart_data(_tables, version: str, chart_id: str, courses: tuple):
+    data = CHART_DATA[chart_id](_tables, list(courses))
+    # Plain strings serialise more compactly than categoricals with unused categories
+    return data.astype({col: str for col in data.columns if data[col].dtype == "category"})
+
+
+def _grouped_bars(data, x: str, y: str, x_title: str, y_title: str, title: str):
+    import altair as alt
+
+    types = [t for t in GRADUATE_TYPES if t in set(data["Type"])]
+    return alt.Chart(data, title=title).mark_bar().encode(
+        x=alt.X(f"{x}:N", sort=None, title=x_title, axis=alt.Axis(labelAngle=-45)),
+        xOffset=alt.XOffset("Type:N", sort=types),
+        y=alt.Y(f"{y}:Q", title=y_title),
+        color=alt.Color("Type:N", sort=types, scale=alt.Scale(scheme="set2"), title="Graduate Type"),
+        tooltip=[x, "Type", alt.Tooltip(f"{y}:Q", format=",.1f")]
+    ).properties(height=450)
+
+#prepare_default_chart_data
+def prepare_default_chart_data():
+    """Aggregate the rows of every interactive chart with its default selection, without importing altair."""
+    tables, version = load_tables()
+    for chart_id, courses in _default_selections(tables).items():
+        _chart_data(tables, version, chart_id, tuple(sorted(courses)))
+
+#vega_chart
+def vega_chart(tables, version: str, chart_id: str, courses=()):
+    """Altair (Vega-Lite) version of a dashboard chart, with hover tooltips and zoom."""
+    import altair as alt
+
+    data = _chart_data(tables, version, chart_id, tuple(sorted(courses)))
+    if chart_id in ("enrolment", "graduates"):
+        return alt.Chart(data, title=CHART_TITLES[chart_id]).mark_line(point=True).encode(
+            x=alt.X("Year:O", title="Year"),
+            y=alt.Y("Count:Q", title="Number of Students"),
+            color=alt.Color("SexCourse:N", title="Sex - Course"),
+            tooltip=["Year", "SexCourse", alt.Tooltip("Count:Q", format=",.0f")]
+        ).properties(height=450).interactive()
+    if chart_id == "employment":
+        return _grouped_bars(data, "Indicator", "Percentage", None, "Percentage (%)", CHART_TITLES[chart_id])
+    return _grouped_bars(data, "CourseYear", "Salary", "Course Cluster (Year)", "Salary ($)", CHART_TITLES[chart_id])
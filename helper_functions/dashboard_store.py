@@ -0,0 +1,135 @@
+import os
+import json
+import hashlib
+import threading
+import pandas as pd
+import streamlit as st
+from helper_functions.singstat import tidy_course_series, tidy_graduate_survey
+
+DATA_DIR = "Data"
+STORE_DIR = "./cache/dashboard"  # tidy Parquet tables derived from Data/, safe to delete
+MANIFEST_FILE = "manifest.json"  # source file signatures the stored tables were built from
+STORE_FORMAT = 3  # bump when the tidy functions change, so existing tables are rebuilt
+
+_store_lock = threading.Lock()
+
+
+def tidy_fees(df, institution: str):
+    """Fee schedules carry no institution column when they come from a single institution."""
+    df = df.copy()
+    df["Fees"] = pd.to_numeric(df["Fees"], errors="coerce")
+    if "Institution" not in df.columns:
+        df.insert(0, "Institution", institution)
+    return df
+
+
+def tidy_salary(df):
+    df_long = tidy_graduate_survey(df, "Course Cluster", "Salary")
+    df_long["CourseYear"] = df_long["Course Cluster"].astype(str) + " (" + df_long["Year"].astype(str) + ")"
+    return df_long
+
+
+# Table name -> (source CSV in DATA_DIR, function turning the raw CSV into the stored table)
+SOURCES = {
+    "fees": (
+        "2024NgeeAnnPolytechnicFulltimeDiplomaCourseFeesSemester.csv",
+        lambda df: tidy_fees(df, "Ngee Ann Polytechnic")
+    ),
+    "enrolment": (
+        "EnrolmentInPolytechnicDiplomaCoursesByTypeOfCourseAndSexAnnual.csv",
+        lambda df: tidy_course_series(df, "Enrolment")
+    ),
+    "graduates": (
+        "GraduatesFromPolytechnicDiplomaCoursesByTypeOfCourseAndSexAnnual.csv",
+        lambda df: tidy_course_series(df, "Graduates")
+    ),
+    "employment": ("ges_employment_indicators.csv", lambda df: tidy_graduate_survey(df, "Indicator", "Percentage")),
+    "salary": ("ges_median_salary.csv", tidy_salary)
+}
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_manifest(store_dir: str) -> dict:
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_manifest(store_dir: str, manifest: dict):
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+#refresh_store
+def refresh_store(data_dir: str = DATA_DIR, store_dir: str = STORE_DIR) -> list:
+    """
+    Rebuild the Parquet table of every source CSV that changed since it was stored and
+    return the names of the rebuilt tables. A source whose mtime or size changed is
+    hashed, and only rebuilt if its contents differ.
+    """
+    with _store_lock:
+        os.makedirs(store_dir, exist_ok=True)
+        manifest = _load_manifest(store_dir)
+        rebuilt, changed = [], False
+        for name, (filename, tidy) in SOURCES.items():
+            source = os.path.join(data_dir, filename)
+            table_path = os.path.join(store_dir, f"{name}.parquet")
+            stat = os.stat(source)
+            entry = manifest.get(name)
+            if entry and entry.get("format") != STORE_FORMAT:
+                entry = None
+            if (entry and os.path.exists(table_path)
+                    and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size):
+                continue
+            sha256 = _file_hash(source)
+            if not (entry and os.path.exists(table_path) and entry["sha256"] == sha256):
+                tidy(pd.read_csv(source)).to_parquet(table_path + ".tmp", index=False)
+                os.replace(table_path + ".tmp", table_path)
+                rebuilt.append(name)
+            manifest[name] = {
+                "source": filename, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                "sha256": sha256, "format": STORE_FORMAT
+            }
+            changed = True
+        if changed:
+            _write_manifest(store_dir, manifest)
+        return rebuilt
+
+#get_dataset_version
+def get_dataset_version(store_dir: str = STORE_DIR) -> str:
+    """Return a token that changes whenever the contents of any source CSV change."""
+    manifest = _load_manifest(store_dir)
+    stamps = [f"format:{STORE_FORMAT}"] + [f"{name}:{manifest.get(name, {}).get('sha256')}" for name in SOURCES]
+    return hashlib.sha256("|".join(stamps).encode("utf-8")).hexdigest()[:16]
+
+# Only the current version is kept; the tables are shared by every session and must
+# not be modified in place.
+@st.cache_resource(max_entries=1, show_spinner="Loading dashboard data...")
+def _load_tables(store_dir: str, version: str) -> dict:
+    with _store_lock:
+        return {name: pd.read_parquet(os.path.join(store_dir, f"{name}.parquet")) for name in SOURCES}
+
+#load_tables
+def load_tables(data_dir: str = DATA_DIR, store_dir: str = STORE_DIR):
+    """
+    Return (tables, version): the tidy dashboard tables by name, with the numeric
+    conversions already applied, and the dataset version they were built from.
+    """
+    refresh_store(data_dir, store_dir)
+    version = get_dataset_version(store_dir)
+    return _load_tables(store_dir, version), version
+
+
+if __name__ == "__main__":
+    # python -m helper_functions.dashboard_store builds the tables ahead of the first page load
+    print(f"Rebuilt: {refresh_store() or 'nothing, all tables are current'}")
@@ -0,0 +1,130 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from array import array
+from langchain_core.embeddings import Embeddings
+
+CACHE_PATH = "./cache/embeddings.sqlite3"
+MAX_ENTRIES = 200_000  # about 1.2 GB of float32 vectors at 1536 dimensions
+
+#normalize_text
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different copies of a text share one cache entry."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+#cache_key
+def cache_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\n{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding store in SQLite. Vectors are kept as packed float32
+    blobs and the least recently used entries are evicted once max_entries is exceeded.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = MAX_ENTRIES):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model: str, texts):
+        """Return a cached vector or None for each text."""
+        keys = [cache_key(model, text) for text in texts]
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                marks = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", batch
+                ).fetchall()
+                found.update((key, array("f", blob).tolist()) for key, blob in rows)
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE key IN ({marks})", [time.time(), *batch]
+                    )
+            self._conn.commit()
+        return [found.get(key) for key in keys]
+
+    def put_many(self, model: str, texts, vectors):
+        now = time.time()
+        rows = [
+            (cache_key(model, text), model, array("f", vector).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, model, vector, last_used) VALUES (?, ?, ?, ?)", rows
+            )
+            self._count += max(cursor.rowcount, 0)
+            if self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # Drop down to 90% of the limit so eviction does not run on every insert
+        keep = int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (keep,)
+        )
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+#get_embedding_cache
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide cache shared by ingestion, queries and llm.get_embedding."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache()
+        return _cache
+
+#embed_with_cache
+def embed_with_cache(texts, model: str, embed_fn):
+    """Embed texts, calling embed_fn only for the ones missing from the cache."""
+    texts = list(texts)
+    cache = get_embedding_cache()
+    vectors = cache.get_many(model, texts)
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        # Duplicates within one call are embedded once
+        unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+        new_vectors = embed_fn(unique_texts)
+        cache.put_many(model, unique_texts, new_vectors)
+        by_text = dict(zip(unique_texts, new_vectors))
+        for i in missing:
+            vectors[i] = by_text[texts[i]]
+    return vectors
+
+
+class CachedEmbeddings(Embeddings):
+    """LangChain embeddings wrapper that reads and fills the shared embedding cache."""
+
+    def __init__(self, underlying: Embeddings, model: str):
+        self.underlying = underlying
+        self.model = model
+
+    def embed_documents(self, texts):
+        return embed_with_cache(texts, self.model, self.underlying.embed_documents)
+
+    def embed_query(self, text):
+        return embed_with_cache([text], self.model, lambda batch: [self.underlying.embed_query(batch[0])])[0]
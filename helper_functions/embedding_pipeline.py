@@ -0,0 +1,131 @@
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import openai
+import helper_functions.llm as llm
+from helper_functions.embedding_cache import get_embedding_cache
+
+MAX_BATCH_TOKENS = 20_000  # well below the per-request limit, keeps retries cheap
+MAX_BATCH_SIZE = 256
+MAX_WORKERS = 4
+MAX_RETRIES = 6
+BASE_DELAY = 1.0  # seconds, doubled on every consecutive rate limit
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    return isinstance(error, openai.RateLimitError) or getattr(error, "status_code", None) == 429
+
+
+class _Backoff:
+    """Shared pause so that one 429 slows down every worker, not just the one that hit it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+
+    def wait(self):
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def trip(self, attempt: int):
+        delay = BASE_DELAY * (2 ** attempt) + random.uniform(0, BASE_DELAY)
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+
+def _call_with_backoff(embed_fn, batch, backoff: _Backoff):
+    for attempt in range(MAX_RETRIES + 1):
+        backoff.wait()
+        try:
+            return embed_fn(batch)
+        except Exception as e:
+            if not _is_rate_limit(e) or attempt == MAX_RETRIES:
+                raise
+            print(f"Embedding rate limited, retrying batch of {len(batch)} (attempt {attempt + 1})")
+            backoff.trip(attempt)
+
+#pack_batches
+def pack_batches(texts, max_tokens: int = MAX_BATCH_TOKENS, max_size: int = MAX_BATCH_SIZE):
+    """Group text positions into batches that stay within a token and item budget."""
+    batches, current, current_tokens = [], [], 0
+    for i, tokens in enumerate(llm.count_tokens_batch(texts)):
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_size):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+#iter_embedded_batches
+def iter_embedded_batches(texts, model: str, embed_fn, max_workers: int = MAX_WORKERS):
+    """
+    Yield (positions, vectors) as soon as each batch is available. Cached vectors come first,
+    the rest are embedded concurrently and written to the embedding cache batch by batch,
+    so an interrupted run resumes without paying for finished batches again.
+    """
+    texts = list(texts)
+    cache = get_embedding_cache()
+    cached = cache.get_many(model, texts)
+    hits = [i for i, vector in enumerate(cached) if vector is not None]
+    if hits:
+        yield hits, [cached[i] for i in hits]
+
+    # Duplicate texts are embedded once and fanned back out to every position
+    positions_by_text = {}
+    for i, vector in enumerate(cached):
+        if vector is None:
+            positions_by_text.setdefault(texts[i], []).append(i)
+    unique_texts = list(positions_by_text)
+    if not unique_texts:
+        return
+
+    backoff = _Backoff()
+    batches = iter(pack_batches(unique_texts))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        in_flight = {}
+
+        def submit_next():
+            batch = next(batches, None)
+            if batch is not None:
+                batch_texts = [unique_texts[i] for i in batch]
+                in_flight[pool.submit(_call_with_backoff, embed_fn, batch_texts, backoff)] = batch_texts
+
+        # Only max_workers batches are queued at a time, new ones are submitted as others finish
+        for _ in range(max_workers):
+            submit_next()
+        try:
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch_texts = in_flight.pop(future)
+                    vectors = future.result()
+                    cache.put_many(model, batch_texts, vectors)
+                    positions, batch_vectors = [], []
+                    for text, vector in zip(batch_texts, vectors):
+                        for i in positions_by_text[text]:
+                            positions.append(i)
+                            batch_vectors.append(vector)
+                    yield positions, batch_vectors
+                    submit_next()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+#embed_texts
+def embed_texts(texts, model: str, embed_fn, progress=None):
+    """Embed texts through the batched pipeline and return the vectors in input order."""
+    texts = list(texts)
+    vectors = [None] * len(texts)
+    done = 0
+    for positions, batch_vectors in iter_embedded_batches(texts, model, embed_fn):
+        for i, vector in zip(positions, batch_vectors):
+            vectors[i] = vector
+        done += len(positions)
+        if progress is not None:
+            progress(done, len(texts))
+    return vectors
@@ -0,0 +1,36 @@
+import streamlit as st
+
+ANNUAL_SEMESTERS = ["Semester 1", "Semester 2"]  # semesters that make up one year of tuition
+CUBE_KEYS = ["Institution", "Citizenship", "Year"]
+
+#build_fee_cube
+def build_fee_cube(df_fees):
+    """
+    Annual tuition for every institution × citizenship × year in one grouped pass: the
+    mean fee of each semester (as the old per-citizenship pivot tables took it), summed
+    over ANNUAL_SEMESTERS. Returns a Series indexed by CUBE_KEYS.
+    """
+    df = df_fees[df_fees["Semester"].isin(ANNUAL_SEMESTERS)]
+    per_semester = df.groupby(CUBE_KEYS + ["Semester"], observed=True, sort=True)["Fees"].mean()
+    return per_semester.groupby(level=CUBE_KEYS, observed=True).sum()
+
+# Built once per dataset version; the fees table itself is not hashed, the version identifies it
+@st.cache_data(max_entries=1, show_spinner=False)
+def get_fee_cube(_df_fees, version: str):
+    return build_fee_cube(_df_fees)
+
+#annual_fee
+def annual_fee(cube, citizenship: str, institution: str = None, year: int = None):
+    """
+    Annual tuition for one citizenship from the cube, or None if there is none. Defaults
+    to the first institution and the latest year on record for it.
+    """
+    if institution is None:
+        institution = cube.index.get_level_values("Institution")[0]
+    try:
+        by_year = cube.loc[(institution, citizenship)]
+    except KeyError:
+        return None
+    if year is None:
+        year = by_year.index.max()
+    return by_year.get(year)
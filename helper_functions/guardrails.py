@@ -0,0 +1,198 @@
+import re
+from typing import NamedTuple
+
+FORBIDDEN_PATTERNS = [
+    r"ignore previous instructions",
+    r"system prompt",
+    r"hidden instructions",
+    r"internal instructions",
+    r"reveal secret",
+    r"output hidden",
+    r"hidden",
+    r"revealing",
+    r"python script",
+    r"exfiltrate"
+]
+
+SENSITIVE_KEYWORDS = [
+    "system instructions",
+    "hidden instructions",
+    "developer prompt",
+    "template value",
+    "API Key"
+]
+
+class RuleMatch(NamedTuple):
+    rule: str  # the pattern that fired, as listed in its rule set
+    start: int  # offsets into the full text (or stream)
+    end: int
+    text: str  # the matched text, in its original case
+
+
+_LITERAL_RULE = re.compile(r"[\w ]+")  # plain phrases, with no regex syntax in them
+
+
+def _trie_pattern(phrases) -> str:
+    """
+    One regex for a set of phrases, with common prefixes shared ("hidden(?: instructions)?")
+    so the regex engine does not retry every phrase at every position. Longer phrases are
+    tried before their prefixes.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class GuardrailEngine:
+    """
+    A rule set compiled into one regex, so a text is scanned once however many rules there
+    are. Plain phrases share a prefix trie and the longest phrase wins; rules with regex
+    syntax follow as alternatives. Matching is case-insensitive, on the lowercased text.
+    Rules are expected to match at most holdback characters, which defaults to the length
+    of the longest rule (exact for phrases); the streaming methods keep that much text in
+    hand between chunks.
+    """
+
+    def __init__(self, rules, replacement: str = "[REDACTED]", holdback: int = None):
+        self.rules = list(rules)
+        self.replacement = replacement
+        self.holdback = holdback or max(len(rule) for rule in self.rules)
+        self._rule_by_phrase = {}
+        patterns = []
+        for rule in self.rules:
+            if _LITERAL_RULE.fullmatch(rule):
+                self._rule_by_phrase.setdefault(rule.lower(), rule)
+            else:
+                patterns.append(rule)
+        # Group 1 is the phrase trie; each regex rule gets its own outer group, and the
+        # index of the outer group that closed last identifies the rule
+        self._rule_by_group = {}
+        parts, group = [], 1
+        if self._rule_by_phrase:
+            parts.append(f"({_trie_pattern(self._rule_by_phrase)})")
+            group += 1
+        for rule in sorted(patterns, key=len, reverse=True):
+            self._rule_by_group[group] = rule
+            parts.append(f"((?i:{rule}))")
+            group += re.compile(rule).groups + 1
+        # Lowercased text is scanned case-sensitively, as the old per-rule loop did: several
+        # times faster than IGNORECASE, and a phrase match is then always a key of _rule_by_phrase
+        self._pattern = re.compile("|".join(parts))
+
+    def _finditer(self, text: str, offset: int = 0):
+        lowered = text.lower()
+        # A few characters lowercase to more than one ("İ" -> "i̇"); then map each position
+        # in lowered back to the character of text it came from
+        origin = None if len(lowered) == len(text) else [i for i, char in enumerate(text) for _ in char.lower()]
+        for match in self._pattern.finditer(lowered):
+            rule = self._rule_by_group.get(match.lastindex) or self._rule_by_phrase[match.group()]
+            start, end = match.span()
+            if origin is not None:
+                start, end = (origin[start], origin[end - 1] + 1) if end > start else (origin[start],) * 2
+            yield RuleMatch(rule, start + offset, end + offset, text[start:end])
+
+    def first_match(self, text: str):
+        """The leftmost rule that fires in text, or None."""
+        return next(self._finditer(text), None)
+
+    def matches(self, text: str):
+        return list(self._finditer(text))
+
+    def _redact_until(self, text: str, cut: int, offset: int, on_match):
+        """Redact matches starting before cut; return (redacted text, where it ends in text)."""
+        pieces, pos = [], 0
+        for match in self._finditer(text, offset):
+            if match.start - offset >= cut:
+                break
+            if on_match is not None:
+                on_match(match)
+            pieces += [text[pos:match.start - offset], self.replacement]
+            pos = match.end - offset
+        end = max(pos, cut)
+        pieces.append(text[pos:end])
+        return "".join(pieces), end
+
+    def redact(self, text: str):
+        """Return (text with every match replaced, the matches)."""
+        fired = []
+        redacted, _ = self._redact_until(text, len(text), 0, fired.append)
+        return redacted, fired
+
+    def scan_stream(self, chunks):
+        """
+        Return the first RuleMatch in a stream of text chunks, or None, consuming the
+        stream only as far as needed. Offsets are relative to the start of the stream.
+        """
+        buffer, offset = "", 0
+        for chunk in chunks:
+            buffer += chunk
+            # A match starting this far back cannot be replaced by a longer rule later
+            final = len(buffer) - self.holdback
+            match = next(self._finditer(buffer, offset), None)
+            if match and match.start - offset <= final:
+                return match
+            keep = max(final + 1, 0)
+            buffer, offset = buffer[keep:], offset + keep
+        return next(self._finditer(buffer, offset), None)
+
+    def redact_stream(self, chunks, on_match=None):
+        """
+        Redact a stream of text chunks as it is produced, yielding text as soon as no
+        later chunk can change it. The last holdback - 1 characters are held back, so a
+        match split across chunk boundaries is still caught. on_match, if given, is
+        called with each RuleMatch.
+        """
+        buffer, offset = "", 0
+        for chunk in chunks:
+            buffer += chunk
+            cut = len(buffer) - self.holdback + 1
+            if cut <= 0:
+                continue
+            redacted, end = self._redact_until(buffer, cut, offset, on_match)
+            yield redacted
+            buffer, offset = buffer[end:], offset + end
+        if buffer:
+            yield self._redact_until(buffer, len(buffer), offset, on_match)[0]
+
+
+INPUT_GUARDRAIL = GuardrailEngine(FORBIDDEN_PATTERNS)
+OUTPUT_GUARDRAIL = GuardrailEngine(SENSITIVE_KEYWORDS)
+
+#check_input
+def check_input(user_input: str):
+    """
+    Return the RuleMatch of the prompt injection rule the input trips, or None.
+    """
+    return INPUT_GUARDRAIL.first_match(user_input)
+
+def is_suspicious(user_input: str) -> bool:
+    """
+    Detect if the user input contains prompt injection attempts.
+    """
+    return check_input(user_input) is not None
+
+def sanitize_output(output: str) -> str:
+    """
+    Redact any sensitive keywords accidentally revealed in the output.
+    """
+    return OUTPUT_GUARDRAIL.redact(output)[0]
+
+#sanitize_stream
+def sanitize_stream(chunks, on_match=None):
+    """
+    Redact sensitive keywords from a stream of text chunks as it is produced. A keyword
+    split across chunk boundaries is still caught.
+    """
+    return OUTPUT_GUARDRAIL.redact_stream(chunks, on_match)
@@ -0,0 +1,90 @@
+import io
+import os
+import hashlib
+import streamlit as st
+
+VARIANT_WIDTHS = (480, 960, 1440)  # display widths the WebP variants are generated at
+WEBP_QUALITY = 85  # diagrams are mostly text and lines, which blur below this
+# Streamlit serves static/ next to Login.py at app/static/ (server.enableStaticServing)
+ASSET_DIR = os.path.join("static", "assets")
+ASSET_URL = "app/static/assets"
+
+
+def file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+# Keyed on the file hash only (the path is not hashed): an edited image gets new variants,
+# a renamed or copied one reuses them. Each image is decoded and encoded once per process;
+# the reruns afterwards only read and hash the file.
+@st.cache_data(max_entries=64, show_spinner=False)
+def _encode_variants(_path: str, digest: str) -> dict:
+    from PIL import Image
+
+    with Image.open(_path) as image:
+        image = image.convert("RGB")
+        variants = {}
+        for width in [w for w in VARIANT_WIDTHS if w < image.width] + [image.width]:
+            resized = image if width == image.width else image.resize(
+                (width, round(image.height * width / image.width)), Image.LANCZOS
+            )
+            buffer = io.BytesIO()
+            resized.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=6)
+            variants[width] = (resized.height, buffer.getvalue())
+        return variants
+
+#image_variants
+def image_variants(path: str):
+    """Return (file hash, WebP variants {width: (height, bytes)} at VARIANT_WIDTHS and the original width)."""
+    digest = file_hash(path)
+    return digest, _encode_variants(path, digest)
+
+#pick_variant
+def pick_variant(variants: dict, display_width: int):
+    """Smallest variant at least display_width wide (the largest if none is); returns (width, height, bytes)."""
+    width = min((w for w in variants if w >= display_width), default=max(variants))
+    height, data = variants[width]
+    return width, height, data
+
+#static_serving_enabled
+def static_serving_enabled() -> bool:
+    return bool(st.get_option("server.enableStaticServing"))
+
+#publish_variant
+def publish_variant(digest: str, width: int, data: bytes) -> str:
+    """
+    Write a variant into ASSET_DIR, once, and return its URL. File names carry the content
+    hash, so a name always refers to the same bytes and the browser may cache it for good.
+    """
+    name = f"{digest[:16]}-{width}.webp"
+    path = os.path.join(ASSET_DIR, name)
+    if not os.path.exists(path):
+        os.makedirs(ASSET_DIR, exist_ok=True)
+        # Written under a temporary name first, so no request ever sees half a file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return f"{ASSET_URL}/{name}"
+
+#lazy_image_html
+def lazy_image_html(url: str, width: int, height: int, alt: str = "") -> str:
+    """
+    <img> tag that the browser only requests once it is scrolled near the viewport.
+    The width and height reserve the space, so the page does not jump when it loads.
+    """
+    return (
+        f'<img src="{url}" alt="{alt}" width="{width}" height="{height}" loading="lazy" '
+        f'decoding="async" style="width:100%;height:auto;">'
+    )
+
+
+if __name__ == "__main__":
+    import time
+
+    for name in sorted(os.listdir("images")):
+        path = os.path.join("images", name)
+        start = time.perf_counter()
+        _, variants = image_variants(path)
+        sizes = ", ".join(f"{w}px {len(data) / 1024:.0f} KB" for w, (_, data) in variants.items())
+        print(f"{name}: {os.path.getsize(path) / 1024:.0f} KB -> {sizes} in {(time.perf_counter() - start) * 1000:.0f} ms")
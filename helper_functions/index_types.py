@@ -0,0 +1,122 @@
+import os
+import json
+import math
+import faiss
+
+INDEX_CONFIG_FILE = "index_config.json"
+ANN_INDEX_FILE = "index.ann.faiss"  # search index derived from the flat index.faiss
+INDEX_TYPES = ["Flat", "IVFFlat", "HNSW", "IVFPQ"]
+DEFAULT_PARAMS = {
+    "Flat": {},
+    "IVFFlat": {"nlist": 0, "nprobe": 8},  # nlist 0 picks about 4 * sqrt(n) lists
+    "HNSW": {"M": 32, "efConstruction": 80, "efSearch": 64},
+    "IVFPQ": {"nlist": 0, "nprobe": 8, "m": 16, "nbits": 8}
+}
+# Smallest accepted value of a parameter, 1 unless listed: nlist 0 means auto, and HNSW cannot
+# build a graph with fewer than 2 links per node
+PARAM_MIN = {"nlist": 0, "M": 2}
+
+
+def _checked_params(index_type: str, params: dict) -> dict:
+    """Defaults filled in and every value raised to its minimum; FAISS aborts the process on some zeros."""
+    params = {**DEFAULT_PARAMS.get(index_type, {}), **(params or {})}
+    return {name: max(int(value), PARAM_MIN.get(name, 1)) for name, value in params.items()}
+
+
+def _auto_nlist(n: int, nlist: int) -> int:
+    if nlist <= 0:
+        nlist = int(4 * math.sqrt(n))
+    # k-means wants roughly 39 training points per list
+    return max(1, min(nlist, n // 39))
+
+
+def _largest_divisor(d: int, m: int) -> int:
+    m = max(1, min(m, d))
+    while d % m:
+        m -= 1
+    return m
+
+#build_index
+def build_index(vectors, index_type: str, params: dict):
+    """
+    Build a FAISS index of the given type over vectors, stored at positions 0..n-1 so it
+    lines up with the vectorstore's index_to_docstore_id. Parameters that do not fit a
+    small corpus (too many lists or PQ centroids) are scaled down, values below PARAM_MIN
+    raised to it.
+    """
+    if index_type not in DEFAULT_PARAMS:
+        raise ValueError(f"Unknown index type: {index_type}")
+    params = _checked_params(index_type, params)
+    n, d = vectors.shape
+    if index_type == "Flat":
+        index = faiss.IndexFlatL2(d)
+    elif index_type == "HNSW":
+        index = faiss.IndexHNSWFlat(d, int(params["M"]))
+        index.hnsw.efConstruction = int(params["efConstruction"])
+    elif index_type == "IVFFlat":
+        quantizer = faiss.IndexFlatL2(d)
+        index = faiss.IndexIVFFlat(quantizer, d, _auto_nlist(n, int(params["nlist"])))
+        index.train(vectors)
+    elif index_type == "IVFPQ":
+        quantizer = faiss.IndexFlatL2(d)
+        m = _largest_divisor(d, int(params["m"]))
+        # Each sub-quantizer trains 2**nbits centroids, again about 39 points apiece
+        nbits = max(1, min(int(params["nbits"]), int(math.log2(max(n // 39, 2)))))
+        index = faiss.IndexIVFPQ(quantizer, d, _auto_nlist(n, int(params["nlist"])), m, nbits)
+        index.train(vectors)
+    else:
+        raise ValueError(f"Unknown index type: {index_type}")
+    index.add(vectors)
+    configure_search(index, index_type, params)
+    return index
+
+#configure_search
+def configure_search(index, index_type: str, params: dict):
+    """Apply the query-time knobs (nprobe, efSearch) that are not saved with the index."""
+    params = _checked_params(index_type, params)
+    if index_type in ("IVFFlat", "IVFPQ"):
+        faiss.extract_index_ivf(index).nprobe = int(params["nprobe"])
+    elif index_type == "HNSW":
+        index.hnsw.efSearch = int(params["efSearch"])
+
+#search_parameters
+def search_parameters(index, selector):
+    """SearchParameters of the right subclass for index, restricted by selector."""
+    if isinstance(index, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=index.nprobe)
+    if isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+#load_index_config
+def load_index_config(folder: str):
+    """Return (index_type, params) saved with the index, Flat if none was saved."""
+    path = os.path.join(folder, INDEX_CONFIG_FILE)
+    if not os.path.exists(path):
+        return "Flat", {}
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    return config["type"], config.get("params", {})
+
+#save_search_index
+def save_search_index(flat_index, folder: str, index_type: str, params: dict):
+    """Write the index config and, for non-flat types, the derived search index into folder."""
+    with open(os.path.join(folder, INDEX_CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump({"type": index_type, "params": params or {}}, f)
+    if index_type != "Flat":
+        vectors = flat_index.reconstruct_n(0, flat_index.ntotal)
+        faiss.write_index(build_index(vectors, index_type, params), os.path.join(folder, ANN_INDEX_FILE))
+
+#load_search_index
+def load_search_index(folder: str, ntotal: int):
+    """Return the derived search index if one matches the flat index, else None."""
+    index_type, params = load_index_config(folder)
+    path = os.path.join(folder, ANN_INDEX_FILE)
+    if index_type == "Flat" or not os.path.exists(path):
+        return None
+    index = faiss.read_index(path)
+    if index.ntotal != ntotal:
+        print(f"Search index out of date ({index.ntotal} vs {ntotal} vectors), using the flat index")
+        return None
+    configure_search(index, index_type, params)
+    return index
@@ -0,0 +1,166 @@
+import io
+import re
+import csv
+import codecs
+import itertools
+import zipfile
+import pandas as pd
+from chardet.universaldetector import UniversalDetector
+from langchain_core.documents import Document
+import helper_functions.llm as llm
+
+CSV_CHUNK_ROWS = 500  # rows parsed at a time, keeps memory flat for large CSVs
+READ_BLOCK_SIZE = 64 * 1024
+CHUNK_TOKENS = 400  # token budget per chunk, including the source and header lines
+YEAR_PATTERN = re.compile(r"\b((?:19|20)\d{2})(?:\.0)?\b")
+
+#list_csv_members
+def list_csv_members(zip_ref: zipfile.ZipFile):
+    """CSV files at the top level of the archive, same as the ones extractall used to expose."""
+    return [
+        info for info in zip_ref.infolist()
+        if not info.is_dir() and "/" not in info.filename and info.filename.lower().endswith(".csv")
+    ]
+
+#detect_encoding
+def detect_encoding(zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo) -> str:
+    """
+    Stream the member once to check it is valid UTF-8, falling back to chardet.
+    Only one block is held in memory at a time.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with zip_ref.open(info) as f:
+        try:
+            while block := f.read(READ_BLOCK_SIZE):
+                decoder.decode(block)
+            decoder.decode(b"", final=True)
+            return "utf-8"
+        except UnicodeDecodeError:
+            pass
+
+    detector = UniversalDetector()
+    with zip_ref.open(info) as f:
+        while block := f.read(READ_BLOCK_SIZE):
+            detector.feed(block)
+            if detector.done:
+                break
+    detector.close()
+    return detector.result["encoding"] or "latin1"
+
+#iter_csv_frames
+def iter_csv_frames(zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo, rows: int = CSV_CHUNK_ROWS):
+    """Yield the CSV as DataFrames of at most rows rows, read straight from the archive."""
+    encoding = detect_encoding(zip_ref, info)
+    with zip_ref.open(info) as f:
+        for frame in pd.read_csv(f, encoding=encoding, chunksize=rows):
+            yield frame
+
+def _csv_line(writer, buffer, values) -> str:
+    buffer.seek(0)
+    buffer.truncate()
+    writer.writerow(values)
+    return buffer.getvalue().rstrip("\n")
+
+#iter_csv_rows
+def iter_csv_rows(zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo):
+    """
+    Yield the column names first, then (line, values) per record where line is the
+    record written back as CSV with quoting kept intact.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for n, frame in enumerate(iter_csv_frames(zip_ref, info)):
+        if n == 0:
+            yield [str(column) for column in frame.columns]
+        # Missing values are written as empty fields, the same as DataFrame.to_csv
+        frame = frame.astype(object).where(frame.notna(), "")
+        for values in frame.itertuples(index=False, name=None):
+            yield _csv_line(writer, buffer, values), values
+
+def _as_year(value):
+    match = YEAR_PATTERN.fullmatch(str(value).strip())
+    return int(match.group(1)) if match else None
+
+#extract_metadata
+def extract_metadata(source: str, columns, rows) -> dict:
+    """
+    Metadata stored with a chunk: its source file, column schema and the courses and
+    years it covers. Years come from year-like column names (wide SingStat tables and
+    "Fresh Graduates 2022" style headers) or from a Year column; courses come from any
+    column with "course" in its name or from the "Sex: Course" labels in DataSeries.
+    """
+    years = set()
+    courses = set()
+    for column in columns:
+        match = YEAR_PATTERN.search(column)
+        if match:
+            years.add(int(match.group(1)))
+
+    year_columns = [i for i, column in enumerate(columns) if column.strip().lower() == "year"]
+    course_columns = [i for i, column in enumerate(columns) if "course" in column.lower()]
+    series_columns = [i for i, column in enumerate(columns) if column.strip() == "DataSeries"]
+    for values in rows:
+        for i in year_columns:
+            year = _as_year(values[i])
+            if year is not None:
+                years.add(year)
+        for i in course_columns:
+            course = str(values[i]).strip()
+            if course:
+                courses.add(course)
+        for i in series_columns:
+            course = str(values[i]).split(":", 1)[-1].strip()
+            if course:
+                courses.add(course)
+
+    return {
+        "source": source,
+        "columns": list(columns),
+        "courses": sorted(courses),
+        "years": sorted(years)
+    }
+
+#iter_row_chunks
+def iter_row_chunks(zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo, max_tokens: int = CHUNK_TOKENS):
+    """
+    Group whole records into chunks of at most max_tokens and yield (text, metadata).
+    Every chunk starts with the source file name and the column header, and chunks
+    never overlap. A record larger than the budget becomes a chunk of its own, and a file
+    with a header but no records becomes one header-only chunk, so it is still indexed.
+    """
+    rows = iter_csv_rows(zip_ref, info)
+    columns = next(rows, None)
+    if columns is None:
+        return
+    buffer = io.StringIO()
+    header = _csv_line(csv.writer(buffer, lineterminator="\n"), buffer, columns)
+    prefix = f"Source: {info.filename}\n{header}"
+    prefix_tokens = llm.count_tokens(prefix) + 1
+
+    def make_chunk(current):
+        text = prefix + "\n" + "\n".join(line for line, _ in current)
+        return text, extract_metadata(info.filename, columns, [values for _, values in current])
+
+    current, current_tokens = [], prefix_tokens
+    # Rows are token-counted a block at a time with the batch API
+    while block := list(itertools.islice(rows, CSV_CHUNK_ROWS)):
+        counts = llm.count_tokens_batch([line for line, _ in block])
+        for (line, values), tokens in zip(block, counts):
+            row_tokens = tokens + 1  # the newline joining it to the chunk
+            if current and current_tokens + row_tokens > max_tokens:
+                yield make_chunk(current)
+                current, current_tokens = [], prefix_tokens
+            current.append((line, values))
+            current_tokens += row_tokens
+    if current:
+        yield make_chunk(current)
+    else:
+        # Header only: the column names are all there is to retrieve the file by
+        yield prefix, extract_metadata(info.filename, columns, [])
+
+#iter_documents
+def iter_documents(zip_ref: zipfile.ZipFile, members):
+    """Yield row-aware chunk Documents for every CSV member without materialising the whole corpus."""
+    for info in members:
+        for text, metadata in iter_row_chunks(zip_ref, info):
+            yield Document(page_content=text, metadata=metadata)
@@ -0,0 +1,78 @@
+import os
+import re
+import json
+import math
+from collections import Counter
+
+LEXICAL_INDEX_FILE = "lexical_index.json"
+# Keeps course codes and fee figures such as 1564.5 as single tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+#tokenize
+def tokenize(text: str):
+    return TOKEN_PATTERN.findall(text.lower())
+
+#build_lexical_index
+def build_lexical_index(vectorstore) -> dict:
+    """Term postings and document lengths over every chunk in the vectorstore."""
+    doc_ids, lengths, postings = [], [], {}
+    for doc_id in vectorstore.index_to_docstore_id.values():
+        tokens = tokenize(vectorstore.docstore.search(doc_id).page_content)
+        n = len(doc_ids)
+        doc_ids.append(doc_id)
+        lengths.append(len(tokens))
+        for term, tf in Counter(tokens).items():
+            postings.setdefault(term, []).append([n, tf])
+    return {"doc_ids": doc_ids, "lengths": lengths, "postings": postings}
+
+#save_lexical_index
+def save_lexical_index(vectorstore, folder: str):
+    with open(os.path.join(folder, LEXICAL_INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump(build_lexical_index(vectorstore), f)
+
+
+class LexicalIndex:
+    """BM25 index over the chunks, bound to the FAISS positions of one loaded vectorstore."""
+
+    def __init__(self, data: dict, vectorstore):
+        position_of = {doc_id: i for i, doc_id in vectorstore.index_to_docstore_id.items()}
+        positions = [position_of.get(doc_id) for doc_id in data["doc_ids"]]
+        lengths = data["lengths"]
+        avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        n_docs = len(lengths)
+
+        # Precompute the per-posting BM25 weight so a query is just a sum of lookups
+        self.postings = {}
+        for term, entries in data["postings"].items():
+            idf = math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            weights = []
+            for n, tf in entries:
+                if positions[n] is None:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[n] / avg_length) if avg_length else BM25_K1
+                weights.append((positions[n], idf * tf * (BM25_K1 + 1) / (tf + norm)))
+            self.postings[term] = weights
+
+    @classmethod
+    def load(cls, folder: str, vectorstore):
+        """Return the saved index, or None for an index built before lexical search existed."""
+        path = os.path.join(folder, LEXICAL_INDEX_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), vectorstore)
+
+    def knows_all(self, terms) -> bool:
+        return bool(terms) and all(term in self.postings for term in terms)
+
+    def search(self, query: str, k: int = 5, positions=None):
+        """BM25 search returning (FAISS position, score) pairs, optionally limited to positions."""
+        allowed = set(positions.tolist()) if positions is not None else None
+        scores = {}
+        for term in set(tokenize(query)):
+            for position, weight in self.postings.get(term, []):
+                if allowed is None or position in allowed:
+                    scores[position] = scores.get(position, 0.0) + weight
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
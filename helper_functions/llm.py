@@ -1,8 +1,11 @@
 import os
+import functools
 from dotenv import load_dotenv
-from openai import OpenAI
-import tiktoken
 import streamlit as st
+from helper_functions.completion_cache import get_completion_cache
+
+# openai, httpx, tiktoken and the embedding pipeline are imported where they are first used,
+# so pages that only need the login helpers (Login.py) start without loading them
 
 load_dotenv('env_variables.env')
 
@@ -31,18 +34,71 @@ def getClient(role:str, username:str):
         print(f"llm function error: {e}")
     return message
 
-# Pass the API Key to the OpenAI Client
+# Connection settings for the shared HTTP transport; each can be overridden under [OPENAI]
+# in secrets.toml (e.g. HTTP_TIMEOUT = 60)
+HTTP_SETTINGS = {
+    # Seconds, applied separately to each read, write and wait for a pooled connection, not to
+    # the whole request: a streamed answer can run longer as long as no gap between chunks does
+    "HTTP_TIMEOUT": 60.0,
+    "HTTP_CONNECT_TIMEOUT": 5.0,  # seconds to open a new connection
+    "HTTP_MAX_CONNECTIONS": 20,
+    "HTTP_MAX_KEEPALIVE_CONNECTIONS": 10,
+    "HTTP_KEEPALIVE_EXPIRY": 60.0  # seconds an idle connection is kept open
+}
+
+def _http_setting(name):
+    try:
+        return st.secrets["OPENAI"].get(name, HTTP_SETTINGS[name])
+    except Exception:
+        return HTTP_SETTINGS[name]
+
+#get_http_client
+# One pooled keep-alive transport for every OpenAI call in the process, so requests reuse
+# open TLS connections; also passed to the LangChain OpenAI wrappers as http_client
+@st.cache_resource(show_spinner=False)
+def get_http_client():
+    import httpx
+    return httpx.Client(
+        timeout=httpx.Timeout(float(_http_setting("HTTP_TIMEOUT")), connect=float(_http_setting("HTTP_CONNECT_TIMEOUT"))),
+        limits=httpx.Limits(
+            max_connections=int(_http_setting("HTTP_MAX_CONNECTIONS")),
+            max_keepalive_connections=int(_http_setting("HTTP_MAX_KEEPALIVE_CONNECTIONS")),
+            keepalive_expiry=float(_http_setting("HTTP_KEEPALIVE_EXPIRY"))
+        )
+    )
+
+# Pass the API Key to the OpenAI Client, created once and shared by all callers
+@st.cache_resource(show_spinner=False)
 def get_OpenAIClient():
-    client = OpenAI(api_key=st.secrets["OPENAI"]["OPENAI_API_KEY"])
+    from openai import OpenAI
+    return OpenAI(api_key=st.secrets["OPENAI"]["OPENAI_API_KEY"], http_client=get_http_client())
 
 #get_embedding
+# Texts embedded before are served from the local embedding cache without an API call,
+# the rest are sent in token-budgeted batches with retries on rate limits
 def get_embedding(input, model='text-embedding-3-small'):
-    client=get_OpenAIClient()
-    response = client.embeddings.create(
-        input=input,
-        model=model
-    )
-    return [x.embedding for x in response.data]
+    import helper_functions.embedding_pipeline as embedding_pipeline
+
+    def embed(texts):
+        client=get_OpenAIClient()
+        response = client.embeddings.create(
+            input=texts,
+            model=model
+        )
+        return [x.embedding for x in response.data]
+
+    texts = [input] if isinstance(input, str) else input
+    return embedding_pipeline.embed_texts(texts, model, embed)
+
+# Requests at temperature 0 are answered from the local completion cache when the exact
+# same request (model, messages, temperature, top_p, max_tokens, response_format) was made before
+def _cached_completion(request):
+    def create():
+        client=get_OpenAIClient()
+        response = client.chat.completions.create(n=1, **request)
+        return response.choices[0].message.content
+
+    return get_completion_cache().get_or_create(request, create)
 
 #get_completion
 # This is the "Updated" helper function for calling LLM
@@ -53,43 +109,63 @@ def get_completion(prompt, model="gpt-4o-mini", temperature=0, top_p=1.0, max_to
       output_json_structure = None
 
     messages = [{"role": "user", "content": prompt}]
-    client=get_OpenAIClient()
-    response = client.chat.completions.create( #originally was openai.chat.completions
-        model=model,
-        messages=messages,
-        temperature=temperature,
-        top_p=top_p,
-        max_tokens=max_tokens,
-        n=1,
-        response_format=output_json_structure,
-    )
-    return response.choices[0].message.content
+    return _cached_completion({ #originally was openai.chat.completions
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "top_p": top_p,
+        "max_tokens": max_tokens,
+        "response_format": output_json_structure,
+    })
 
 #get_completion_by_messages
 # Note that this function directly take in "messages" as the parameter.
 def get_completion_by_messages(messages, model="gpt-4o-mini", temperature=0, top_p=1.0, max_tokens=1024, n=1):
-    client=get_OpenAIClient()
-    response = client.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature=temperature,
-        top_p=top_p,
-        max_tokens=max_tokens,
-        n=1
-    )
-    return response.choices[0].message.content
+    return _cached_completion({
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "top_p": top_p,
+        "max_tokens": max_tokens,
+    })
 
 
-# This function is for calculating the tokens given the "message"
-# ⚠️ This is simplified implementation that is good enough for a rough estimation
+# The tiktoken encoder is resolved (and its BPE file loaded) once per process
+TOKEN_COUNT_THREADS = 8
+# Chat format overhead for gpt-4o/gpt-4o-mini: every message is wrapped in 3 tokens,
+# a "name" field costs 1 more, and every reply is primed with 3 tokens
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_NAME = 1
+TOKENS_PER_REPLY = 3
+
+#get_encoding
+@functools.lru_cache(maxsize=None)
+def get_encoding(model='gpt-4o-mini'):
+    import tiktoken
+    return tiktoken.encoding_for_model(model)
+
 #count_tokens
 def count_tokens(text):
-    encoding = tiktoken.encoding_for_model('gpt-4o-mini')
-    return len(encoding.encode(text))
+    return len(get_encoding().encode_ordinary(text))
+
+#count_tokens_batch
+# Counts many texts in one call; tiktoken encodes the batch on a thread pool
+def count_tokens_batch(texts, num_threads=TOKEN_COUNT_THREADS):
+    return [len(tokens) for tokens in get_encoding().encode_ordinary_batch(list(texts), num_threads=num_threads)]
 
 #count_tokens_from_messages
+# Prompt tokens of a chat request, including the per-message formatting overhead
 def count_tokens_from_message(messages):
-    encoding = tiktoken.encoding_for_model('gpt-4o-mini')
-    value = ' '.join([x.get('content') for x in messages])
-    return len(encoding.encode(value))
-
+    values = []
+    names = 0
+    for message in messages:
+        for key, value in message.items():
+            if isinstance(value, list):
+                # Multi-part content: only text parts are counted
+                values.extend(part.get("text", "") for part in value if isinstance(part, dict))
+            elif value is not None:
+                values.append(str(value))
+            if key == "name":
+                names += 1
+    overhead = TOKENS_PER_MESSAGE * len(messages) + TOKENS_PER_NAME * names + TOKENS_PER_REPLY
+    return sum(count_tokens_batch(values)) + overhead
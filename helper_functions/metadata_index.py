@@ -0,0 +1,99 @@
+import os
+import json
+import numpy as np
+import faiss
+from helper_functions.index_types import search_parameters
+
+METADATA_INDEX_FILE = "metadata_index.json"
+FILTER_FIELDS = ["source", "courses", "years"]  # chunk metadata fields that can be filtered on
+
+#build_postings
+def build_postings(vectorstore) -> dict:
+    """Inverted index field -> value (as a string) -> docstore ids, from the chunk metadata."""
+    postings = {field: {} for field in FILTER_FIELDS}
+    for doc_id in vectorstore.index_to_docstore_id.values():
+        doc = vectorstore.docstore.search(doc_id)
+        for field in FILTER_FIELDS:
+            values = doc.metadata.get(field)
+            if values is None:
+                continue
+            if not isinstance(values, list):
+                values = [values]
+            for value in values:
+                postings[field].setdefault(str(value), []).append(doc_id)
+    return postings
+
+#save_postings
+def save_postings(vectorstore, folder: str):
+    with open(os.path.join(folder, METADATA_INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump(build_postings(vectorstore), f)
+
+
+class MetadataIndex:
+    """
+    Metadata postings bound to the FAISS positions of one loaded vectorstore. Filters
+    narrow a search to the matching vectors before any scoring happens.
+    """
+
+    def __init__(self, postings: dict, vectorstore):
+        position_of = {doc_id: i for i, doc_id in vectorstore.index_to_docstore_id.items()}
+        self.positions = {
+            field: {
+                value: np.array(sorted(position_of[i] for i in ids if i in position_of), dtype=np.int64)
+                for value, ids in values.items()
+            }
+            for field, values in postings.items()
+        }
+
+    @classmethod
+    def load(cls, folder: str, vectorstore):
+        """Return the saved index, or None for an index built before metadata was stored."""
+        path = os.path.join(folder, METADATA_INDEX_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), vectorstore)
+
+    def values(self, field: str):
+        """Distinct values of a field, for building filter widgets."""
+        values = self.positions.get(field, {})
+        if field == "years":
+            return sorted(values, key=int)
+        return sorted(values)
+
+    def candidate_positions(self, filters: dict):
+        """
+        FAISS positions matching every field in filters (any of the values within a field).
+        Returns None when no filter is set, meaning no restriction.
+        """
+        candidates = None
+        for field, wanted in filters.items():
+            if not wanted:
+                continue
+            postings = self.positions.get(field, {})
+            matched = [postings[str(value)] for value in wanted if str(value) in postings]
+            matched = np.unique(np.concatenate(matched)) if matched else np.array([], dtype=np.int64)
+            candidates = matched if candidates is None else np.intersect1d(candidates, matched, assume_unique=True)
+        return candidates
+
+#search_positions
+def search_positions(vectorstore, query_vector, k: int = 5, positions=None):
+    """
+    Vector search returning (FAISS position, score) pairs. When positions is given only
+    those vectors are scored, through a FAISS id selector.
+    """
+    if positions is not None and len(positions) == 0:
+        return []
+    vector = np.array([query_vector], dtype=np.float32)
+    if vectorstore._normalize_L2:
+        faiss.normalize_L2(vector)
+    if positions is None:
+        scores, indices = vectorstore.index.search(vector, min(k, vectorstore.index.ntotal))
+    else:
+        params = search_parameters(vectorstore.index, faiss.IDSelectorBatch(positions))
+        scores, indices = vectorstore.index.search(vector, min(k, len(positions)), params=params)
+    return [(int(i), float(score)) for score, i in zip(scores[0], indices[0]) if i != -1]
+
+#document_at
+def document_at(vectorstore, position: int):
+    return vectorstore.docstore.search(vectorstore.index_to_docstore_id[position])
@@ -0,0 +1,70 @@
+import time
+import asyncio
+import contextlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from helper_functions.guardrails import check_input
+from helper_functions.retrieval import hybrid_search, is_keyword_query
+
+# Kept outside the event loop so that asyncio.run does not wait on a cancelled embedding
+# request before returning the guardrail verdict; the abandoned call finishes in the background
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="query-pipeline")
+
+
+async def _timed(timings: dict, stage: str, fn, *args, **kwargs):
+    """Run a blocking stage on a worker thread and record how long it took in ms."""
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+    finally:
+        timings[stage] = (time.perf_counter() - start) * 1000
+
+
+async def _retrieve(timings, query, vectorstore, metadata_index, lexical_index, filters, k, answer_lookup):
+    query_vector = None
+    # Keyword queries are served by BM25 alone and need no embedding
+    if not is_keyword_query(lexical_index, query):
+        query_vector = await _timed(timings, "embedding", vectorstore.embeddings.embed_query, query)
+    if answer_lookup is not None:
+        answer = await _timed(timings, "answer_cache", answer_lookup, query_vector)
+        if answer is not None:
+            return {"answer": answer, "docs": [], "query_vector": query_vector}
+    docs = await _timed(
+        timings, "retrieval", hybrid_search,
+        vectorstore, metadata_index, lexical_index, query, k=k, filters=filters, query_vector=query_vector
+    )
+    return {"answer": None, "docs": docs, "query_vector": query_vector}
+
+
+async def _run(query, vectorstore, metadata_index, lexical_index, filters, k, answer_lookup):
+    timings = {}
+    start = time.perf_counter()
+    # The injection check and the embedding request start together; retrieval follows the
+    # embedding without waiting for the check, and a suspicious verdict cancels whatever
+    # is still in flight
+    guard = asyncio.create_task(_timed(timings, "guardrail", check_input, query))
+    work = asyncio.create_task(
+        _retrieve(timings, query, vectorstore, metadata_index, lexical_index, filters, k, answer_lookup)
+    )
+    rule_match = await guard
+    if rule_match is not None:
+        work.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await work
+        result = {"suspicious": True, "rule": rule_match.rule, "answer": None, "docs": [], "query_vector": None}
+    else:
+        result = {"suspicious": False, "rule": None, **await work}
+    timings["total"] = (time.perf_counter() - start) * 1000
+    result["timings"] = timings
+    return result
+
+#run_query_pipeline
+def run_query_pipeline(query: str, vectorstore, metadata_index, lexical_index, filters=None, k: int = 8,
+                       answer_lookup=None) -> dict:
+    """
+    Guardrail check, query embedding, answer cache lookup and hybrid retrieval for one
+    query, overlapped on an event loop. answer_lookup(query_vector) may return a cached
+    answer, in which case retrieval is skipped. Returns a dict with suspicious, rule (the
+    guardrail rule that fired), answer, docs, query_vector and per-stage timings in ms.
+    """
+    return asyncio.run(_run(query, vectorstore, metadata_index, lexical_index, filters, k, answer_lookup))
@@ -0,0 +1,42 @@
+from helper_functions.lexical_index import tokenize
+from helper_functions.metadata_index import search_positions, document_at
+
+RRF_K = 60  # standard reciprocal rank fusion constant
+FETCH_MULTIPLIER = 4  # each retriever ranks k * FETCH_MULTIPLIER candidates before fusion
+KEYWORD_QUERY_TERMS = 3  # queries this short whose terms are all indexed skip the embedding call
+
+#reciprocal_rank_fusion
+def reciprocal_rank_fusion(rankings, k: int = RRF_K):
+    """Fuse several ranked lists of positions into one, best first."""
+    scores = {}
+    for ranking in rankings:
+        for rank, position in enumerate(ranking):
+            scores[position] = scores.get(position, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
+
+#is_keyword_query
+def is_keyword_query(lexical_index, query: str) -> bool:
+    terms = tokenize(query)
+    return lexical_index is not None and len(terms) <= KEYWORD_QUERY_TERMS and lexical_index.knows_all(terms)
+
+#hybrid_search
+def hybrid_search(vectorstore, metadata_index, lexical_index, query: str, k: int = 5, filters=None, query_vector=None):
+    """
+    Retrieve k Documents by fusing BM25 and vector rankings, after applying the metadata
+    filters to both. Short keyword queries are answered from the lexical index alone.
+    query_vector can be passed in when the caller has already embedded the query.
+    """
+    positions = metadata_index.candidate_positions(filters or {}) if metadata_index is not None else None
+    fetch_k = k * FETCH_MULTIPLIER
+
+    rankings = []
+    if lexical_index is not None:
+        lexical = lexical_index.search(query, fetch_k, positions)
+        if lexical and is_keyword_query(lexical_index, query):
+            return [document_at(vectorstore, i) for i, _ in lexical[:k]]
+        rankings.append([i for i, _ in lexical])
+
+    if query_vector is None:
+        query_vector = vectorstore.embeddings.embed_query(query)
+    rankings.append([i for i, _ in search_positions(vectorstore, query_vector, fetch_k, positions)])
+    return [document_at(vectorstore, i) for i in reciprocal_rank_fusion(rankings)[:k]]
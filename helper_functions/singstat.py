@@ -0,0 +1,91 @@
+import re
+import numpy as np
+import pandas as pd
+
+MISSING_VALUES = {"na", "n.a.", "-", ""}  # SingStat and GES markers for unavailable figures
+SEX_PATTERN = re.compile(r"^\s*(Male|Female)s\b")
+COURSE_PATTERN = re.compile(r"^(?:[^:]*:)?\s*(.*?)\s*$")  # text after the first ":", if any
+GRADUATE_TYPE_PATTERN = re.compile(r"^\s*(Fresh|Post-NS|Combined)")
+YEAR_PATTERN = re.compile(r"(\d{4})\s*$")
+GRADUATE_TYPES = ["Fresh", "Post-NS", "Combined", "Unknown"]
+
+#coerce_numeric
+def coerce_numeric(values):
+    """
+    Convert a Series of SingStat/GES figures to floats. "na", "-" and blanks become NaN,
+    and thousands separators and a trailing "%" are dropped.
+    """
+    if values.dtype != object:
+        return values.astype(float)
+    numbers = pd.to_numeric(values, errors="coerce")
+    # Only cells that did not parse as they are need cleaning ("1,234", "91.4%")
+    retry = numbers.isna() & values.notna()
+    if retry.any():
+        cleaned = values[retry].astype(str).str.strip().str.rstrip("%").str.replace(",", "", regex=False)
+        numbers[retry] = pd.to_numeric(cleaned.mask(cleaned.str.lower().isin(MISSING_VALUES)), errors="coerce")
+    return numbers.astype(float)
+
+
+def _parse_labels(labels, pattern, categories=None, missing=None):
+    """
+    Extract the first group of pattern from each distinct value of the categorical
+    Series labels, and spread the results back to every row as a categorical. Rows
+    whose label is missing, or does not match, get missing.
+    """
+    parsed = labels.cat.categories.to_series().str.extract(pattern)[0].to_numpy(dtype=object)
+    parsed[pd.isna(parsed)] = missing
+    # Code -1 (missing label) picks the extra last entry
+    lookup = pd.Categorical(np.append(parsed, missing), categories=categories)
+    return pd.Categorical.from_codes(lookup.codes[labels.cat.codes.to_numpy()], dtype=lookup.dtype)
+
+
+def _constant(value, n: int):
+    return pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), categories=[value])
+
+
+def _melt(df, id_col: str, var_name: str, value_name: str):
+    """
+    Wide → long in one reshape of the value block: id_col and the column labels become
+    categoricals (row-major by column, like DataFrame.melt) and the values are coerced
+    to floats.
+    """
+    value_cols = [col for col in df.columns if col != id_col]
+    n_rows = len(df)
+    ids = df[id_col].astype(pd.CategoricalDtype(df[id_col].dropna().unique()))  # keeps the table's order
+    return pd.DataFrame({
+        id_col: pd.Categorical.from_codes(np.tile(ids.cat.codes.to_numpy(), len(value_cols)), dtype=ids.dtype),
+        var_name: pd.Categorical.from_codes(
+            np.repeat(np.arange(len(value_cols)), n_rows), categories=pd.Index(value_cols, dtype=object)
+        ),
+        value_name: coerce_numeric(pd.Series(df[value_cols].to_numpy().ravel(order="F")))
+    })
+
+#tidy_course_series
+def tidy_course_series(df, type_label: str):
+    """
+    SingStat "Males: Course"/"Females: Course" wide table (one column per year) → one row
+    per series and year with DataSeries, Year, Count, Sex, Course and Type. Sex and
+    Course are categoricals parsed from the distinct series names, not from every row.
+    """
+    df_long = _melt(df.rename(columns=str.strip), "DataSeries", "Year", "Count")
+    years = df_long["Year"].cat.categories.astype(int).to_numpy()
+    df_long["Year"] = years[df_long["Year"].cat.codes.to_numpy()]
+    df_long["Sex"] = _parse_labels(df_long["DataSeries"], SEX_PATTERN, categories=["Male", "Female"])
+    df_long["Course"] = _parse_labels(df_long["DataSeries"], COURSE_PATTERN, missing="Total")
+    df_long["Type"] = _constant(type_label, len(df_long))
+    return df_long
+
+#tidy_graduate_survey
+def tidy_graduate_survey(df, id_col: str, value_name: str):
+    """
+    Graduate Employment Survey wide table, with columns such as "Fresh Graduates 2024"
+    and "Post-NS (PNS) Graduates 2023" → one row per id_col value, graduate type and
+    year with TypeYear, value_name, Type and Year.
+    """
+    df_long = _melt(df, id_col, "TypeYear", value_name)
+    df_long["Type"] = _parse_labels(
+        df_long["TypeYear"], GRADUATE_TYPE_PATTERN, GRADUATE_TYPES, missing="Unknown"
+    ).remove_unused_categories()  # chart legends follow the categories
+    years = df_long["TypeYear"].cat.categories.to_series().str.extract(YEAR_PATTERN)[0].astype(int)
+    df_long["Year"] = years.to_numpy()[df_long["TypeYear"].cat.codes.to_numpy()]
+    return df_long
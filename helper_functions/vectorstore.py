@@ -0,0 +1,235 @@
+import os
+import json
+import hashlib
+import shutil
+import tempfile
+import threading
+from typing import NamedTuple
+import streamlit as st
+from langchain_community.vectorstores import FAISS
+from langchain_openai import OpenAIEmbeddings
+import helper_functions.llm as llm
+from helper_functions.embedding_cache import CachedEmbeddings
+import helper_functions.embedding_pipeline as embedding_pipeline
+from helper_functions.metadata_index import MetadataIndex, save_postings
+from helper_functions.lexical_index import LexicalIndex, save_lexical_index
+from helper_functions.index_types import ANN_INDEX_FILE, load_index_config, save_search_index, load_search_index
+
+PERSIST_DIR = "./faiss_db"  # permanent folder shared by the upload and assistant pages
+INDEX_FILES = ["index.faiss", "index.pkl"]
+MANIFEST_FILE = "manifest.json"  # chunk hashes already embedded into the index
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Streamlit serves every session from one process, so a single lock is enough to stop
+# a reader from loading the index while the upload page is swapping its files.
+_index_lock = threading.RLock()
+
+#get_index_version
+def get_index_version(persist_dir: str = PERSIST_DIR) -> str:
+    """Return a token that changes whenever the persisted index files are rewritten."""
+    stamps = []
+    for name in INDEX_FILES:
+        path = os.path.join(persist_dir, name)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            stamps.append(f"{name}:{stat.st_mtime_ns}:{stat.st_size}")
+    return "|".join(stamps)
+
+#get_embeddings
+def get_embeddings(apikey: str):
+    """Embedding client used for both building and querying the index, backed by the local cache."""
+    embeddings = OpenAIEmbeddings(api_key=apikey, model=EMBEDDING_MODEL, http_client=llm.get_http_client())
+    return CachedEmbeddings(embeddings, EMBEDDING_MODEL)
+
+class CourseIndex(NamedTuple):
+    version: str  # get_index_version of the files all three were loaded from
+    vectorstore: FAISS
+    metadata_index: MetadataIndex  # None for a legacy index
+    lexical_index: LexicalIndex  # None for a legacy index
+
+
+# Only one version is kept: when faiss_db changes the next rerun loads the new index and
+# the old one is released once no session holds a reference to it. The metadata and
+# lexical indexes are loaded with the vectorstore, so they always address the same positions.
+@st.cache_resource(max_entries=1, show_spinner="Loading course index...")
+def _load_course_index(persist_dir: str, version: str, apikey: str) -> CourseIndex:
+    vectorstore = FAISS.load_local(
+        folder_path=persist_dir,
+        embeddings=get_embeddings(apikey),
+        allow_dangerous_deserialization=True  # safe, the index is only written by the upload page
+    )
+    # Queries go to the IVF/HNSW/PQ index when one was built; the flat index is only
+    # needed by the upload page to apply incremental changes
+    search_index = load_search_index(persist_dir, vectorstore.index.ntotal)
+    if search_index is not None:
+        vectorstore.index = search_index
+    return CourseIndex(
+        version, vectorstore, MetadataIndex.load(persist_dir, vectorstore), LexicalIndex.load(persist_dir, vectorstore)
+    )
+
+#get_course_index
+def get_course_index(apikey: str, persist_dir: str = PERSIST_DIR) -> CourseIndex:
+    """
+    Return the process-wide read-only CourseIndex, reloading it only if faiss_db changed.
+    The version is read and the files loaded under the lock, so an upload cannot swap
+    them in between.
+    """
+    with _index_lock:
+        return _load_course_index(persist_dir, get_index_version(persist_dir), apikey)
+
+def _remove_file(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+#save_vectorstore
+def save_vectorstore(vectorstore, persist_dir: str = PERSIST_DIR, chunk_ids=None, index_config=None):
+    """
+    Persist the vectorstore to its own staging folder and swap the files into place.
+    index_config is (index_type, params) for the search index; by default the type
+    already saved in persist_dir is kept. vectorstore must hold the flat index.
+    """
+    index_type, params = index_config or load_index_config(persist_dir)
+    # A fresh staging folder per save, next to persist_dir so the files can be os.replace'd:
+    # two uploads saving at once never touch each other's files, and each swap below moves
+    # one complete, consistent set under the lock
+    persist_dir = persist_dir.rstrip("/\\")
+    staging_dir = tempfile.mkdtemp(
+        prefix=os.path.basename(persist_dir) + ".staging-", dir=os.path.dirname(persist_dir) or "."
+    )
+    try:
+        vectorstore.save_local(staging_dir)
+        save_search_index(vectorstore.index, staging_dir, index_type, params)
+        save_postings(vectorstore, staging_dir)
+        save_lexical_index(vectorstore, staging_dir)
+        if chunk_ids is not None:
+            _write_manifest(staging_dir, chunk_ids)
+        os.makedirs(persist_dir, exist_ok=True)
+        with _index_lock:
+            if chunk_ids is None:
+                # Ids were not tracked, so the next ingestion has to rebuild from scratch
+                _remove_file(os.path.join(persist_dir, MANIFEST_FILE))
+            if index_type == "Flat":
+                _remove_file(os.path.join(persist_dir, ANN_INDEX_FILE))
+            for name in os.listdir(staging_dir):
+                os.replace(os.path.join(staging_dir, name), os.path.join(persist_dir, name))
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+#chunk_hash
+def chunk_hash(text: str) -> str:
+    """Content hash of a chunk, also used as its docstore id."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+#load_manifest
+def load_manifest(persist_dir: str = PERSIST_DIR):
+    """Return the manifest saved next to the index, or None if there is none."""
+    path = os.path.join(persist_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _write_manifest(staging_dir: str, chunk_ids):
+    manifest = {"embedding_model": EMBEDDING_MODEL, "chunks": sorted(chunk_ids)}
+    with open(os.path.join(staging_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+INGEST_WINDOW = 2000  # new chunks held in memory before they are embedded and added
+
+def _add_documents(vectorstore, embeddings, pending, on_batch=None):
+    """
+    Embed pending (id, Document) pairs batch by batch and add them to the index,
+    calling on_batch(n) after each batch of n chunks is added.
+    """
+    ids = [chunk_id for chunk_id, _ in pending]
+    docs = [doc for _, doc in pending]
+    texts = [doc.page_content for doc in docs]
+    # Finished batches are also in the embedding cache, so a failed upload can be
+    # retried without re-embedding them
+    for positions, vectors in embedding_pipeline.iter_embedded_batches(
+        texts, EMBEDDING_MODEL, embeddings.underlying.embed_documents
+    ):
+        text_embeddings = [(texts[i], vector) for i, vector in zip(positions, vectors)]
+        metadatas = [docs[i].metadata for i in positions]
+        batch_ids = [ids[i] for i in positions]
+        if vectorstore is None:
+            vectorstore = FAISS.from_embeddings(text_embeddings, embeddings, metadatas=metadatas, ids=batch_ids)
+        else:
+            vectorstore.add_embeddings(text_embeddings, metadatas=metadatas, ids=batch_ids)
+        if on_batch is not None:
+            on_batch(len(positions))
+    return vectorstore
+
+#sync_vectorstore
+def sync_vectorstore(docs, apikey: str, persist_dir: str = PERSIST_DIR, progress=None, index_config=None) -> dict:
+    """
+    Bring the persisted index in line with docs, embedding only chunks it has not seen.
+    Chunks missing from docs are deleted. An index without a usable manifest is rebuilt.
+    docs may be a generator; new chunks are embedded in windows of INGEST_WINDOW.
+    progress(added, queued) is called after every embedding batch, queued being the new
+    chunks read so far (the final total once docs is exhausted). index_config is
+    (index_type, params) for the search index, by default the saved one is kept.
+    """
+    index_config = index_config or load_index_config(persist_dir)
+    reindex = tuple(index_config) != load_index_config(persist_dir)
+    embeddings = get_embeddings(apikey)
+    manifest = load_manifest(persist_dir)
+    vectorstore = None
+    known_ids = set()
+    if manifest is not None and manifest.get("embedding_model") == EMBEDDING_MODEL:
+        with _index_lock:
+            vectorstore = FAISS.load_local(
+                folder_path=persist_dir,
+                embeddings=embeddings,
+                allow_dangerous_deserialization=True
+            )
+        known_ids = set(manifest["chunks"])
+        # A manifest that disagrees with the index cannot be trusted for a partial update
+        if known_ids != set(vectorstore.index_to_docstore_id.values()):
+            vectorstore, known_ids = None, set()
+    rebuilt = vectorstore is None
+
+    seen_ids = set()
+    pending = []
+    added = 0
+    queued = 0
+
+    def batch_added(n):
+        nonlocal added
+        added += n
+        if progress is not None:
+            progress(added, queued)
+
+    for doc in docs:
+        chunk_id = chunk_hash(doc.page_content)
+        # Identical chunks share one vector
+        if chunk_id in seen_ids:
+            continue
+        seen_ids.add(chunk_id)
+        if chunk_id not in known_ids:
+            pending.append((chunk_id, doc))
+            queued += 1
+        if len(pending) >= INGEST_WINDOW:
+            vectorstore = _add_documents(vectorstore, embeddings, pending, batch_added)
+            pending = []
+    if pending:
+        vectorstore = _add_documents(vectorstore, embeddings, pending, batch_added)
+    if not seen_ids:
+        raise ValueError("No chunks to index")
+
+    removed_ids = list(known_ids - seen_ids)
+    stats = {
+        "added": added,
+        "removed": len(removed_ids),
+        "unchanged": len(seen_ids) - added,
+        "rebuilt": rebuilt,
+        "index_type": index_config[0],
+        "reindexed": reindex
+    }
+    if not added and not removed_ids and not reindex:
+        return stats
+    if removed_ids:
+        vectorstore.delete(removed_ids)
+
+    save_vectorstore(vectorstore, persist_dir, chunk_ids=seen_ids, index_config=index_config)
+    return stats
@@ -0,0 +1,93 @@
+import os
+import time
+import threading
+import streamlit as st
+
+# Every step imports what it needs itself, so importing this module from Login.py is cheap
+
+
+def _warm_tokenizer():
+    import helper_functions.llm as llm
+    llm.get_encoding()
+
+
+def _warm_openai_client():
+    import helper_functions.llm as llm
+    llm.get_OpenAIClient()
+
+
+def _warm_course_index():
+    import helper_functions.vectorstore as vectorstore_helper
+    if not os.path.exists(os.path.join(vectorstore_helper.PERSIST_DIR, "index.faiss")):
+        return "no index uploaded yet"
+    apikey = st.secrets["OPENAI"]["OPENAI_API_KEY"]
+    vectorstore_helper.get_course_index(apikey)
+
+
+def _warm_dashboard():
+    from helper_functions.dashboard_store import load_tables
+    from helper_functions.fee_kpis import get_fee_cube
+    import helper_functions.dashboard_charts as dashboard_charts
+    tables, version = load_tables()
+    get_fee_cube(tables["fees"], version)
+    # Only the default chart mode is warmed; static PNGs would load matplotlib for nothing
+    if dashboard_charts.DEFAULT_CHART_MODE == "Interactive":
+        dashboard_charts.prepare_default_chart_data()
+    else:
+        dashboard_charts.prerender_default_charts()
+
+
+def _warm_images():
+    from helper_functions.image_assets import image_variants
+    for name in os.listdir("images"):
+        image_variants(os.path.join("images", name))
+
+
+# Name -> step; a step may return a note to log instead of its timing (e.g. why it was skipped)
+WARMUP_STEPS = {
+    "tiktoken encoder": _warm_tokenizer,
+    "OpenAI client": _warm_openai_client,
+    "FAISS course index": _warm_course_index,
+    "dashboard tables, fee KPIs and default charts": _warm_dashboard,
+    "methodology images": _warm_images
+}
+
+#warmup_enabled
+def warmup_enabled() -> bool:
+    """On unless WARMUP = false is set in secrets.toml."""
+    try:
+        return bool(st.secrets.get("WARMUP", True))
+    except Exception:
+        return True
+
+#run_warmup
+def run_warmup(steps=None) -> dict:
+    """
+    Run the warm-up steps one after another, logging how long each took. A failing step
+    is logged and skipped; whatever it would have loaded is then loaded on first use.
+    Returns the timings in milliseconds.
+    """
+    timings = {}
+    start = time.perf_counter()
+    for name, step in (steps or WARMUP_STEPS).items():
+        step_start = time.perf_counter()
+        try:
+            note = step()
+            timings[name] = (time.perf_counter() - step_start) * 1000
+            print(f"Warm-up: {name} {note if note else f'ready in {timings[name]:,.0f} ms'}")
+        except Exception as e:
+            print(f"Warm-up: {name} failed after {(time.perf_counter() - step_start) * 1000:,.0f} ms: {e}")
+    timings["total"] = (time.perf_counter() - start) * 1000
+    print(f"Warm-up: finished in {timings['total']:,.0f} ms")
+    return timings
+
+#start_warmup
+# Once per server process, on the first page load: the steps run on a background thread,
+# so the page that triggered them renders without waiting
+@st.cache_resource(show_spinner=False)
+def start_warmup():
+    if not warmup_enabled():
+        return None
+    thread = threading.Thread(target=run_warmup, name="warmup", daemon=True)
+    thread.start()
+    return thread
@@ -1,12 +1,8 @@
 import streamlit as st
 import zipfile
-import tempfile
-import os
-import pandas as pd
-import chardet
-from langchain_community.vectorstores import FAISS
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
+import helper_functions.ingestion as ingestion
+import helper_functions.vectorstore as vectorstore_helper
+from helper_functions.index_types import INDEX_TYPES, DEFAULT_PARAMS, PARAM_MIN, load_index_config
 
 st.title("Upload Relevant Course Details")
 
@@ -21,57 +17,54 @@ elif st.session_state["role"] != "Admin":
 try:
     apikey = st.secrets["OPENAI"]["OPENAI_API_KEY"]
 
-    # --- Helper function to read CSV with encoding detection ---
-    def read_csv_with_fallback(path):
-        try:
-            return pd.read_csv(path, encoding="utf-8")
-        except UnicodeDecodeError:
-            with open(path, "rb") as f:
-                raw = f.read()
-                result = chardet.detect(raw)
-                enc = result["encoding"] or "latin1"
-            return pd.read_csv(path, encoding=enc)
+    # --- Search index type, saved with the index and used by the Course Assistant ---
+    saved_type, saved_params = load_index_config(vectorstore_helper.PERSIST_DIR)
+    with st.expander("Index settings"):
+        index_type = st.selectbox(
+            "FAISS index type", INDEX_TYPES, index=INDEX_TYPES.index(saved_type),
+            help="Flat is exact; IVFFlat, HNSW and IVFPQ trade some recall for faster, smaller search. "
+                 "Run benchmarks/faiss_index_benchmark.py to compare them on the current corpus."
+        )
+        index_params = {}
+        for name, default in DEFAULT_PARAMS[index_type].items():
+            value = saved_params.get(name, default) if index_type == saved_type else default
+            min_value = PARAM_MIN.get(name, 1)
+            index_params[name] = int(st.number_input(name, min_value=min_value, value=max(int(value), min_value), step=1))
 
     uploaded_file = st.file_uploader("Upload a ZIP file containing CSVs", type=["zip"])
 
     if uploaded_file is not None:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Save the uploaded zip file
-            zip_path = os.path.join(tmpdir, "uploaded.zip")
-            with open(zip_path, "wb") as f:
-                f.write(uploaded_file.getvalue())
-
-            # Extract all files in zipfile
-            with zipfile.ZipFile(zip_path, "r") as zip_ref:
-                zip_ref.extractall(tmpdir)
-
-            st.success("✅ ZIP file extracted!")
+        # Members are streamed straight out of the uploaded archive, nothing is extracted to disk
+        with zipfile.ZipFile(uploaded_file, "r") as zip_ref:
+            st.success("✅ ZIP file opened!")
 
             # Collect CSV files
-            csv_files = [os.path.join(tmpdir, f) for f in os.listdir(tmpdir) if f.endswith(".csv")]
+            csv_files = ingestion.list_csv_members(zip_ref)
             st.write(f"Found **{len(csv_files)}** CSV files.")
 
-            documents = []
-            for csv_file in csv_files:
-                df = read_csv_with_fallback(csv_file)
-                csv_text = df.to_csv(index=False)
-                documents.append(csv_text)
-
-            # Split into chunks
-            splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-            docs = splitter.create_documents(documents)
-
-            # --- Persist FAISS vectorstore ---
-            persist_directory = "./faiss_db"  # permanent folder
-            embeddings = OpenAIEmbeddings(api_key=apikey, model='text-embedding-3-small')
-            vectorstore = FAISS.from_documents(
-                documents=docs,
-                embedding=embeddings
+            # CSVs are parsed in row blocks and grouped into whole-row chunks, each prefixed with
+            # its file name and header, lazily as the index consumes them
+            docs = ingestion.iter_documents(zip_ref, csv_files)
+
+            # --- Persist FAISS vectorstore, embedding only chunks not already in the index ---
+            persist_directory = vectorstore_helper.PERSIST_DIR  # permanent folder
+            progress_bar = st.progress(0.0, text="Embedding chunks...")
+            def show_progress(done, queued):
+                # queued grows while the ZIP is still being read, so the bar can step back
+                progress_bar.progress(done / queued, text=f"Embedded {done} of {queued} new chunks read so far")
+            stats = vectorstore_helper.sync_vectorstore(
+                docs, apikey, persist_directory, progress=show_progress, index_config=(index_type, index_params)
             )
-
-            vectorstore.save_local(persist_directory)
-
-            st.success("✅ FAISS vectorstore created and persisted successfully!")
+            progress_bar.empty()
+
+            if stats["rebuilt"]:
+                st.success("✅ FAISS vectorstore created and persisted successfully!")
+            elif stats["added"] or stats["removed"] or stats["reindexed"]:
+                st.success("✅ FAISS vectorstore updated and persisted successfully!")
+            else:
+                st.info("ℹ️ No changes found, the FAISS vectorstore is already up to date.")
+            st.write(f"Chunks embedded: **{stats['added']}**, removed: **{stats['removed']}**, unchanged: **{stats['unchanged']}**")
+            st.write(f"Search index type: **{stats['index_type']}**")
             st.write(f"FAISS database saved at: `{persist_directory}`")
 
 except Exception as e:
@@ -1,47 +1,12 @@
+import time
 import streamlit as st
-import re
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain.chains import RetrievalQA
 from langchain.prompts import PromptTemplate
-
-# --- Security Config ---
-FORBIDDEN_PATTERNS = [
-    r"ignore previous instructions",
-    r"system prompt",
-    r"hidden instructions",
-    r"internal instructions",
-    r"reveal secret",
-    r"output hidden",
-    r"hidden",
-    r"revealing",
-    r"python script",
-    r"exfiltrate"
-]
-
-SENSITIVE_KEYWORDS = [
-    "system instructions",
-    "hidden instructions",
-    "developer prompt",
-    "template value",
-    "API Key"
-]
-
-def is_suspicious(user_input: str) -> bool:
-    """
-    Detect if the user input contains prompt injection attempts.
-    """
-    user_input_lower = user_input.lower()
-    return any(re.search(pattern, user_input_lower) for pattern in FORBIDDEN_PATTERNS)
-
-def sanitize_output(output: str) -> str:
-    """
-    Redact any sensitive keywords accidentally revealed in the output.
-    """
-    sanitized = output
-    for keyword in SENSITIVE_KEYWORDS:
-        sanitized = re.sub(keyword, "[REDACTED]", sanitized, flags=re.IGNORECASE)
-    return sanitized
+from helper_functions.guardrails import sanitize_stream
+import helper_functions.llm as llm_helper
+import helper_functions.vectorstore as vectorstore_helper
+from helper_functions.query_pipeline import run_query_pipeline
+from helper_functions.answer_cache import SemanticAnswerCache, answer_scope
+from helper_functions.context_packing import pack_context
 
 # --- Streamlit UI ---
 st.title("Course Assistant")
@@ -55,18 +20,6 @@ try:
     # --- Load OpenAI API Key ---
     apikey = st.secrets["OPENAI"]["OPENAI_API_KEY"]
 
-    # --- Load FAISS Vectorstore ---
-    PERSIST_DIR = "./faiss_db"  # Path to your saved FAISS index
-    embeddings = OpenAIEmbeddings(api_key=apikey, model='text-embedding-3-small')
-    vectorstore = FAISS.load_local(
-        folder_path=PERSIST_DIR,
-        embeddings=embeddings,
-        allow_dangerous_deserialization=True  # safe if you created this index
-    )
-
-    # --- Create retriever ---
-    retriever = vectorstore.as_retriever(search_kwargs={"k": 5})
-
     # --- Custom prompt for student-focused recommendations ---
     template = """
     You are a helpful academic advisor. 
@@ -80,16 +33,26 @@ try:
 
     Answer helpfully and make specific course or career recommendations when possible.
     """
-    qa_prompt = PromptTemplate.from_template(template)
 
-    # --- RetrievalQA chain ---
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3, api_key=apikey)
-    qa_chain = RetrievalQA.from_chain_type(
-        llm=llm,
-        retriever=retriever,
-        chain_type="stuff",
-        chain_type_kwargs={"prompt": qa_prompt}
-    )
+    # --- Streaming chat model, built once per process and shared by all sessions ---
+    @st.cache_resource(show_spinner=False)
+    def get_llm(apikey: str):
+        from langchain_openai import ChatOpenAI  # only needed once an answer has to be generated
+        # stream_usage adds token counts to the final chunk, for the answer cache report
+        return ChatOpenAI(
+            model="gpt-4o-mini", temperature=0.3, api_key=apikey, stream_usage=True,
+            http_client=llm_helper.get_http_client()  # shared keep-alive connection pool
+        )
+
+    # --- Answers to past questions, shared by all sessions ---
+    @st.cache_resource(show_spinner=False)
+    def get_answer_cache():
+        return SemanticAnswerCache()
+
+    qa_prompt = PromptTemplate.from_template(template)
+    answer_cache = get_answer_cache()
+    # Vectorstore, filter and BM25 indexes and their version, all from the same upload
+    index_version, vectorstore, metadata_index, lexical_index = vectorstore_helper.get_course_index(apikey)
 
     # --- Streamlit UI for query ---
     st.title("🎓 Student Course & Career Advisor")
@@ -100,17 +63,71 @@ try:
     - *Which diploma is best if I want to work in healthcare technology?*
     """)
 
+    # --- Optional metadata filters, applied before vector scoring ---
+    filters = {}
+    if metadata_index is not None:
+        with st.expander("Filter sources"):
+            filters["source"] = st.multiselect("Source files", metadata_index.values("source"))
+            filters["courses"] = st.multiselect("Courses", metadata_index.values("courses"))
+            filters["years"] = st.multiselect("Years", metadata_index.values("years"))
+
     query = st.text_input("Type your query here:")
 
     if query:
-        if is_suspicious(query):
+        scope = answer_scope(filters)
+        with st.spinner("Thinking..."):
+            # The injection check runs alongside the query embedding and retrieval, and
+            # cancels them if the query turns out to be suspicious
+            result = run_query_pipeline(
+                query, vectorstore, metadata_index, lexical_index, filters=filters, k=8,
+                answer_lookup=lambda vector: answer_cache.lookup(query, scope, index_version, vector)
+            )
+            timings = result["timings"]
+            sanitized_response = result["answer"]
+            if not result["suspicious"] and sanitized_response is None:
+                # Deduplicated, ranked rows packed into a fixed token budget
+                start = time.perf_counter()
+                context, context_stats = pack_context(result["docs"])
+                prompt = qa_prompt.format(context=context, question=query)
+                prompt_tokens = llm_helper.count_tokens(prompt)
+                timings["packing"] = (time.perf_counter() - start) * 1000
+
+        if result["suspicious"]:
+            print(f"Course Assistant blocked query, guardrail rule: {result['rule']}")
             st.warning("⚠️ Your query contains suspicious instructions and cannot be processed.")
         else:
-            with st.spinner("Thinking..."):
-                response = qa_chain.run(query)
-            sanitized_response = sanitize_output(response)
             st.subheader("💡 Recommendation")
-            st.write(sanitized_response)
+            if sanitized_response is not None:
+                st.write(sanitized_response)
+            else:
+                usage = {"total_tokens": 0}
+                def answer_tokens():
+                    for chunk in get_llm(apikey).stream(prompt):
+                        if chunk.usage_metadata:
+                            usage["total_tokens"] = chunk.usage_metadata["total_tokens"]
+                        yield chunk.content
+                # Redaction runs on the stream, holding back only enough text to catch a keyword
+                # split across chunks, so the answer appears as soon as the first tokens arrive
+                start = time.perf_counter()
+                sanitized_response = st.write_stream(sanitize_stream(answer_tokens()))
+                timings["generation"] = (time.perf_counter() - start) * 1000
+                st.caption(
+                    f"Prompt: {prompt_tokens:,} tokens, of which context {context_stats['context_tokens']:,} "
+                    f"(budget {context_stats['budget_tokens']:,}) from {context_stats['chunks_used']} of "
+                    f"{context_stats['chunks_retrieved']} retrieved chunks"
+                )
+                answer_cache.store(
+                    query, sanitized_response, scope, index_version, result["query_vector"],
+                    tokens=usage["total_tokens"]
+                )
+
+            cache_stats = answer_cache.stats()
+            st.caption(
+                f"Answer cache: {cache_stats['hit_rate']:.0%} hit rate "
+                f"({cache_stats['hits']} hits, {cache_stats['misses']} misses), "
+                f"{cache_stats['saved_tokens']:,} tokens saved"
+            )
+            st.caption("Timings: " + ", ".join(f"{stage} {ms:,.0f} ms" for stage, ms in timings.items()))
 
 except Exception as e:
     st.error("❌ An error has occurred, please inform the team creators")
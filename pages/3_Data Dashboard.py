@@ -1,8 +1,10 @@
+import functools
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import os
-import seaborn as sns
+from helper_functions.dashboard_store import load_tables
+from helper_functions.fee_kpis import get_fee_cube, annual_fee
+from helper_functions.dashboard_charts import (
+    DEFAULT_COURSES, CHART_MODES, DEFAULT_CHART_MODE, course_options, course_plot_data, render_chart, vega_chart
+)
 
 
 #This page is accessible to both roles
@@ -13,254 +15,134 @@ if "logged_in" not in st.session_state or not st.session_state["logged_in"]:
     st.error("🚫 You must log in first.")
     st.stop()
 
-DATA_DIR = "Data"
 error_list = []
 
-try:
-    # -----------------------------
-    # Load CSVs
-    # -----------------------------
-    df_enrol = pd.read_csv(os.path.join(DATA_DIR, "EnrolmentInPolytechnicDiplomaCoursesByTypeOfCourseAndSexAnnual.csv"))
-    df_grad = pd.read_csv(os.path.join(DATA_DIR, "GraduatesFromPolytechnicDiplomaCoursesByTypeOfCourseAndSexAnnual.csv"))
-    df_fees = pd.read_csv(os.path.join(DATA_DIR, "2024NgeeAnnPolytechnicFulltimeDiplomaCourseFeesSemester.csv"))
-    df_employment = pd.read_csv(os.path.join(DATA_DIR, "ges_employment_indicators.csv"))
-    df_salary = pd.read_csv(os.path.join(DATA_DIR, "ges_median_salary.csv"))
-    # -----------------------------
-    # KPI SUMMARY ROW
-    # -----------------------------
+def show_error(e):
+    st.error("❌ An error has occured, please inform the team creators")
+    print(f"View Data Page Error: {e}")
+
+def section(render):
+    """
+    Run render as a fragment: a widget inside it reruns only that section, not the page.
+    Sections fetch their inputs through load_tables and the chart caches, which are
+    keyed on the dataset version, so a section rerun recomputes nothing else.
+    """
+    @st.fragment
+    @functools.wraps(render)
+    def run():
+        try:
+            render()
+        except Exception as e:
+            show_error(e)
+    return run
+
+def fee_text(fee):
+    # annual_fee returns None when the fees table has no row for the citizenship
+    return "n/a" if fee is None else f"${fee:,.2f}"
+
+def show_chart(chart_id, courses=()):
+    tables, dataset_version = load_tables()
+    # Interactive charts send only the aggregated rows and are drawn in the browser; static
+    # images are rendered on the server (and cached)
+    if st.session_state.get("chart_mode", DEFAULT_CHART_MODE) == "Interactive":
+        st.altair_chart(vega_chart(tables, dataset_version, chart_id, courses), use_container_width=True)
+    else:
+        st.image(render_chart(tables, dataset_version, chart_id, courses), use_container_width=True)
+
+# -----------------------------
+# KPI SUMMARY ROW
+# -----------------------------
+@section
+def fees_section():
     st.header("Fees Overview")
     col1, col2, col3 = st.columns(3)
 
-    # KPI 1: Average Course Fee SG (Year 1 Sem 1)
-
-    df_sg = df_fees[df_fees["Citizenship"] == "Singapore Citizens"]
-    # Pivot table: Semesters as columns
-    df_pivot = df_sg.pivot_table(index="Year", columns="Semester", values="Fees", aggfunc="mean")
-    # Get total tuition for the single year
-    total_fee = df_pivot.loc[df_pivot.index[0], ["Semester 1", "Semester 2"]].sum()
-    # Display KPI in Streamlit
-    col1.metric("💰 Annual Tuition Fee (SG Citizens)", f"${total_fee:,.2f}")
-
-    # KPI 2: Average Course Fee PR (Year 1 Sem 1)
-
-    df_sg = df_fees[df_fees["Citizenship"] == "Singapore Permanent Residents"]
-    # Pivot table: Semesters as columns
-    df_pivot = df_sg.pivot_table(index="Year", columns="Semester", values="Fees", aggfunc="mean")
-    # Get total tuition for the single year
-    total_fee = df_pivot.loc[df_pivot.index[0], ["Semester 1", "Semester 2"]].sum()
-    # Display KPI in Streamlit
-    col2.metric("💰 Annual Tuition Fee (PR)", f"${total_fee:,.2f}")
-
-    # KPI 3: Average Course Fee Int (Year 1 Sem 1)
-
-    df_sg = df_fees[df_fees["Citizenship"] == "International students (includes GST)"]
-    # Pivot table: Semesters as columns
-    df_pivot = df_sg.pivot_table(index="Year", columns="Semester", values="Fees", aggfunc="mean")
-    # Get total tuition for the single year
-    total_fee = df_pivot.loc[df_pivot.index[0], ["Semester 1", "Semester 2"]].sum()
-    # Display KPI in Streamlit
-    col3.metric("💰 Annual Tuition Fee (International students (includes GST))", f"${total_fee:,.2f}")
-
-    ################## Enrolment stats ########################
-    st.header("Enrolment by Sex and Course (2022–2024)")
-
-    def preprocess_df(df, type_label):
-        # Clean column names
-        df.columns = df.columns.str.strip()
-
-        # Melt wide → long
-        df_long = df.melt(id_vars=["DataSeries"], var_name="Year", value_name="Count")
-
-        # Convert Year and Count
-        df_long["Year"] = pd.to_numeric(df_long["Year"], errors="coerce")
-        df_long["Count"] = pd.to_numeric(df_long["Count"], errors="coerce")
-
-        # Split DataSeries into Sex and Course
-        df_long["Sex"] = df_long["DataSeries"].apply(
-            lambda x: "Male" if str(x).strip().startswith("Males") 
-                    else ("Female" if str(x).strip().startswith("Females") else None)
-        )
-        df_long["Course"] = df_long["DataSeries"].str.split(":", n=1).str[-1].str.strip()
-        df_long["Course"].fillna("Total", inplace=True)
-
-        # Add type column
-        df_long["Type"] = type_label
+    # Annual tuition (Semester 1 + Semester 2) for every institution, citizenship and year,
+    # aggregated once per dataset version
+    tables, dataset_version = load_tables()
+    fee_cube = get_fee_cube(tables["fees"], dataset_version)
 
-        return df_long
+    # KPI 1: Annual Tuition Fee SG
+    total_fee = annual_fee(fee_cube, "Singapore Citizens")
+    col1.metric("💰 Annual Tuition Fee (SG Citizens)", fee_text(total_fee))
 
-    # Preprocess datasets
-    df_enrol_long = preprocess_df(df_enrol, "Enrolment")
+    # KPI 2: Annual Tuition Fee PR
+    total_fee = annual_fee(fee_cube, "Singapore Permanent Residents")
+    col2.metric("💰 Annual Tuition Fee (PR)", fee_text(total_fee))
 
-    # Keep last 3 years only
-    latest_years = sorted(df_enrol_long["Year"].unique())[-3:]
-    df_enrol_long = df_enrol_long[df_enrol_long["Year"].isin(latest_years)]
-    df_enrol_long["Year"] = df_enrol_long["Year"].astype(int)
+    # KPI 3: Annual Tuition Fee International
+    total_fee = annual_fee(fee_cube, "International students (includes GST)")
+    col3.metric("💰 Annual Tuition Fee (International students (includes GST))", fee_text(total_fee))
 
-    # Streamlit multiselect filter for courses
-    courses = sorted(df_enrol_long["Course"].unique())
-    selected_courses = st.multiselect("Select Courses", options=courses, default=courses[:3],key="enrol_course_selector")  # default to first 3
-    df_filtered = df_enrol_long[df_enrol_long["Course"].isin(selected_courses)]
+################## Enrolment stats ########################
+@section
+def enrolment_section():
+    st.header("Enrolment by Sex and Course (2022–2024)")
 
-    # Filter out Total rows
-    df_filtered_courses = df_filtered[df_filtered["Course"] != "Total"]
+    tables, _ = load_tables()
+    df_enrol_long = tables["enrolment"]
 
-    plt.figure(figsize=(14, 7))
+    # Streamlit multiselect filter for courses, from the last 3 years
+    courses = course_options(df_enrol_long)
+    selected_courses = st.multiselect("Select Courses", options=courses, default=courses[:DEFAULT_COURSES],key="enrol_course_selector")  # default to first 3
 
-    # Create combined label without modifying the original DataFrame in-place
-    df_plot = df_filtered_courses.copy()
-    df_plot["SexCourse"] = df_plot["Sex"] + " - " + df_plot["Course"]
+    # Selected courses without the Total rows, labelled by sex and course
+    df_plot = course_plot_data(df_enrol_long, selected_courses)
 
     # interactive table, scrollable
     st.dataframe(df_plot)  
 
-    sns.lineplot(
-        data=df_plot,
-        x=df_plot["Year"].astype(str),  # discrete axis
-        y="Count",
-        hue="SexCourse",    # separate line for Male/Female per course
-        markers=True,
-        dashes=False,
-        errorbar=None
-    )
-
-    plt.title("Polytechnic Enrolment by Sex and Course (Last 3 Years)")
-    plt.ylabel("Number of Students")
-    plt.xlabel("Year")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    st.pyplot(plt)
-
-
-    ################# Graduation stats ########################
-    st.header("Graduates by Sex and Course (2022–2024)")
+    show_chart("enrolment", selected_courses)
 
-    # Preprocess datasets
-    df_grad_long = preprocess_df(df_grad, "Graduates")
+################# Graduation stats ########################
+@section
+def graduates_section():
+    st.header("Graduates by Sex and Course (2022–2024)")
 
-    # Keep last 3 years only
-    latest_years = sorted(df_grad_long["Year"].unique())[-3:]
-    df_grad_long = df_grad_long[df_grad_long["Year"].isin(latest_years)]
-    df_grad_long["Year"] = df_grad_long["Year"].astype(int)
+    tables, _ = load_tables()
+    df_grad_long = tables["graduates"]
 
-    # Streamlit multiselect filter for courses
-    courses = sorted(df_grad_long["Course"].unique())
-    selected_courses = st.multiselect("Select Courses", options=courses, default=courses[:3],key="grad_course_selector")  # default to first 3
-    df_grad_filtered = df_grad_long[df_grad_long["Course"].isin(selected_courses)]
+    # Streamlit multiselect filter for courses, from the last 3 years
+    courses = course_options(df_grad_long)
+    selected_courses = st.multiselect("Select Courses", options=courses, default=courses[:DEFAULT_COURSES],key="grad_course_selector")  # default to first 3
 
-    # Filter out Total rows
-    df_grad_filtered_courses = df_grad_filtered[df_grad_filtered["Course"] != "Total"]
+    df_plot = course_plot_data(df_grad_long, selected_courses)
 
-    plt.figure(figsize=(14, 7))
+    st.dataframe(df_plot)   
 
-    # Create combined label without modifying the original DataFrame in-place
-    df_plot = df_grad_filtered_courses.copy()
-    df_plot["SexCourse"] = df_plot["Sex"] + " - " + df_plot["Course"]
+    show_chart("graduates", selected_courses)
 
-    st.dataframe(df_plot)   
+@section
+def employment_section():
+    st.header("Employment Indicators from 2022 to 2024 ")
 
-    sns.lineplot(
-        data=df_plot,
-        x=df_plot["Year"].astype(str), 
-        y="Count",
-        hue="SexCourse",   
-        markers=True,
-        dashes=False,
-        errorbar=None
-    )
+    # Grouped bar chart of the percentages, one bar per graduate type
+    show_chart("employment")
 
-    plt.title("Polytechnic Graduates by Sex and Course (Last 3 Years)")
-    plt.ylabel("Number of Students")
-    plt.xlabel("Year")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    st.pyplot(plt)
+################## Salary ########################
+@section
+def salary_section():
+    st.header("Median Gross Monthly Salary by Course Cluster (2022–2024)")
 
+    # Grouped bar chart per course cluster and year, without the "Overall" row
+    show_chart("salary")
 
-    st.header("Employment Indicators from 2022 to 2024 ")
 
-    # Convert percentage strings to numeric
-    for col in df_employment.columns[1:]:
-        df_employment[col] = df_employment[col].str.rstrip("%").astype(float)
-
-    # Melt the DataFrame: wide → long
-    df_long = df_employment.melt(id_vars="Indicator", var_name="TypeYear", value_name="Percentage")
-
-    # Split TypeYear into Type (Fresh/Post/Combined) and Year
-    df_long["Type"] = df_long["TypeYear"].str.split(" ").str[0]
-    df_long["Year"] = df_long["TypeYear"].str[-4:].astype(int)
-
-    # Plot grouped bar chart
-    plt.figure(figsize=(16, 7))
-    sns.barplot(
-        data=df_long,
-        x="Indicator",
-        y="Percentage",
-        hue="Type",
-        ci=None,
-        palette="Set2"
-    )
-
-    # Overlay the Year info by changing x-axis labels
-    plt.xticks(rotation=45, ha='right')
-    plt.ylabel("Percentage (%)")
-    plt.title("Graduate Employment by Type (Fresh / Post-NS / Combined) 2022–2024")
-    plt.legend(title="Graduate Type")
-    plt.tight_layout()
-    st.pyplot(plt)
-
-    ################## Salary ########################
-    st.header("Median Gross Monthly Salary by Course Cluster (2022–2024)")
+try:
+    # Tidy tables, preprocessed from the CSVs in Data/ and rebuilt only when a CSV changes
+    load_tables()
 
-    # Melt wide → long
-    df_long = df_salary.melt(id_vars="Course Cluster", var_name="TypeYear", value_name="Salary")
-
-    # Extract Type and Year
-    def split_type_year(s):
-        s = s.strip()
-        if "Fresh Graduates" in s:
-            type_ = "Fresh"
-        elif "Post-NS" in s:
-            type_ = "Post-NS"
-        elif "Combined" in s:
-            type_ = "Combined"
-        else:
-            type_ = "Unknown"
-        year = int(s[-4:])
-        return pd.Series([type_, year])
-
-
-    df_long[["Type", "Year"]] = df_long["TypeYear"].apply(split_type_year)
-
-
-    # Create a new column combining Course and Year for x-axis
-    df_long["CourseYear"] = df_long["Course Cluster"] + " (" + df_long["Year"].astype(str) + ")"
-
-    # Omit the "Overall" row
-    df_long = df_long[df_long["Course Cluster"] != "Overall"]
-
-    # Plot grouped bar chart
-    plt.figure(figsize=(18, 8))
-    sns.barplot(
-        data=df_long,
-        x="CourseYear",
-        y="Salary",
-        hue="Type",
-        ci=None,
-        palette="Set2"
-    )
-
-    plt.title("Graduate Salary by Course Cluster (Fresh / Post-NS / Combined) 2022–2024")
-    plt.ylabel("Salary ($)")
-    plt.xlabel("Course Cluster (Year)")
-    plt.xticks(rotation=45, ha='right')
-    plt.legend(title="Graduate Type")
-    plt.tight_layout()
-    st.pyplot(plt)
+    # Changing the chart mode reruns the whole page, since every section draws charts
+    st.radio("Chart mode", CHART_MODES, index=CHART_MODES.index(DEFAULT_CHART_MODE), horizontal=True, key="chart_mode")
 
+    fees_section()
+    enrolment_section()
+    graduates_section()
+    employment_section()
+    salary_section()
 
 except Exception as e:
-    st.error("❌ An error has occured, please inform the team creators")
-    print(f"View Data Page Error: {e}")
+    show_error(e)
 
 with st.expander("Disclaimer"):
     disclaimer = """
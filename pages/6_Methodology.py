@@ -1,6 +1,8 @@
 import streamlit as st
-from PIL import Image
 import os
+from helper_functions.image_assets import image_variants, pick_variant, static_serving_enabled, publish_variant, lazy_image_html
+
+DISPLAY_WIDTH = 960  # half of a wide layout, at up to ~1.5x pixel density
 
 # Set page title
 st.set_page_config(page_title="Methodology", layout="wide")
@@ -31,9 +33,11 @@ diagrams = [
 ]
 
 # Display each diagram in a clean layout
-for diagram in diagrams:
+for i, diagram in enumerate(diagrams):
     if os.path.exists(diagram["file"]):
-        image = Image.open(diagram["file"])
+        # Resized WebP variants, encoded once per image and cached in memory by file hash
+        digest, variants = image_variants(diagram["file"])
+        width, height, data = pick_variant(variants, DISPLAY_WIDTH)
         
         # Numbered header
         st.subheader(diagram["title"])
@@ -41,7 +45,12 @@ for diagram in diagrams:
         # Side-by-side layout (image gets more space now)
         col1, col2 = st.columns([1, 1])  
         with col1:
-            st.image(image, use_container_width=True)  # larger, fits column width
+            if i == 0 or not static_serving_enabled():
+                st.image(data, use_container_width=True)  # larger, fits column width
+            else:
+                # Below the fold: served as a static file the browser fetches only when it is scrolled near
+                url = publish_variant(digest, width, data)
+                st.markdown(lazy_image_html(url, width, height, diagram["title"]), unsafe_allow_html=True)
         with col2:
             # Use HTML to increase font size for readability
             st.markdown(f"<p style='font-size:24px;'>{diagram['desc']}</p>", unsafe_allow_html=True)